@@ -1,9 +1,16 @@
 from rest_framework.authentication import BaseAuthentication
-from rest_framework.exceptions import AuthenticationFailed
 from auth_app.utils.jwt import decode_token
 from auth_app.utils.django_user_proxy import AuthenticatedUser, AnonymousUser
 
 class JWTAuthentication(BaseAuthentication):
+    """
+    Default DRF authentication. DRF runs it at most once per request and
+    memoizes the result on `request.user`; the auth_app decorators build on
+    that. Invalid tokens leave the request anonymous instead of failing it,
+    so the decorators keep their own error responses and public endpoints
+    (local handshake) are unaffected by a stray header.
+    """
+
     def authenticate(self, request):
         auth_header = request.headers.get("Authorization", "")
         if not auth_header.startswith("Bearer "):
@@ -11,5 +18,5 @@ class JWTAuthentication(BaseAuthentication):
         token = auth_header.split(" ")[1]
         payload = decode_token(token)
         if not payload:
-            raise AuthenticationFailed("Invalid or expired token") 
-        return (AuthenticatedUser(payload), None)
\ No newline at end of file
+            return None
+        return (AuthenticatedUser(payload), token)
\ No newline at end of file
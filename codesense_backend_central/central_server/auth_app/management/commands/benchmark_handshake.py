@@ -0,0 +1,140 @@
+# auth_app/management/commands/benchmark_handshake.py
+import base64
+import json
+import math
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from django.core.management.base import BaseCommand, CommandError
+
+from licenses.models.challenge_model import ChallengeModel
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
+from licenses.models.license_model import LicenseModel
+from licenses.models.local_model import LocalModel
+from licenses.models.usage_event_model import UsageEventModel
+from licenses.models.usage_idempotency_model import UsageIdempotencyModel
+
+
+def _post(url, body):
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the local handshake (challenge + assertion) against running servers, "
+        "e.g. the WSGI and the ASGI deployment, and report throughput and p50/p99 latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", action="append", required=True,
+            help="Server base URL, e.g. http://127.0.0.1:8000 (repeat to compare servers)",
+        )
+        parser.add_argument("--requests", type=int, default=2000, help="Handshakes per server")
+        parser.add_argument("--concurrency", type=int, default=64, help="Handshakes in flight")
+        parser.add_argument("--warmup", type=int, default=50, help="Untimed handshakes per server")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Setting up benchmark license and local..."))
+        license_id = str(LicenseModel.create(
+            client_name="Handshake Benchmark",
+            contact_email="benchmark@codesense.dev",
+            limits={"scans": 10**9, "users": 10**9},
+            expiry=datetime.now(timezone.utc) + timedelta(days=1),
+        )["id"])
+        try:
+            local = self._provision(options["url"][0], license_id)
+            for url in options["url"]:
+                self._run(url, local, options)
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error: {e}"))
+        finally:
+            self._cleanup(license_id)
+
+    def _provision(self, url, license_id):
+        private_key = Ed25519PrivateKey.generate()
+        public_pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        status, body = _post(f"{url}/api/local/provision/", {
+            "license_id": license_id, "local_pubkey": public_pem,
+        })
+        if status != 201:
+            raise CommandError(f"Provisioning failed ({status}): {body}")
+        return {
+            "license_id": license_id,
+            "local_id": body["local_id"],
+            "provisioning_jwt": body["provisioning_jwt"],
+            "private_key": private_key,
+        }
+
+    def _handshake(self, url, local):
+        """One challenge + assertion round; returns per-endpoint latencies in seconds."""
+        identity = {
+            "license_id": local["license_id"],
+            "local_id": local["local_id"],
+            "provisioning_jwt": local["provisioning_jwt"],
+        }
+        started = time.perf_counter()
+        status, body = _post(f"{url}/api/local/challenge/", identity)
+        challenge_latency = time.perf_counter() - started
+        if status != 200:
+            raise CommandError(f"Challenge failed ({status}): {body}")
+
+        nonce = body["nonce"]
+        signed = base64.urlsafe_b64encode(local["private_key"].sign(nonce.encode())).decode().rstrip("=")
+        started = time.perf_counter()
+        status, body = _post(f"{url}/api/local/assertion/", {
+            **identity, "nonce": nonce, "signed_nonce": signed, "usage_type": "scan",
+        })
+        assertion_latency = time.perf_counter() - started
+        if status != 200:
+            raise CommandError(f"Assertion failed ({status}): {body}")
+        return challenge_latency, assertion_latency
+
+    def _run(self, url, local, options):
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(lambda _: self._handshake(url, local), range(options["warmup"])))
+
+            started = time.perf_counter()
+            results = list(pool.map(lambda _: self._handshake(url, local), range(options["requests"])))
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{url}: {options['requests']} handshakes in {elapsed:.2f}s, "
+            f"concurrency {options['concurrency']}"
+        ))
+        self.stdout.write(f"  throughput: {2 * len(results) / elapsed:.0f} req/s")
+        for index, name in enumerate(("challenge", "assertion")):
+            samples = [result[index] * 1000 for result in results]
+            self.stdout.write(
+                f"  {name}: p50 {_percentile(samples, 50):.1f} ms, p99 {_percentile(samples, 99):.1f} ms"
+            )
+
+    def _cleanup(self, license_id):
+        LicenseModel.collection.delete_one({"_id": ObjectId(license_id)})
+        LocalModel.collection.delete_many({"license_id": ObjectId(license_id)})
+        ChallengeModel.collection.delete_many({"license_id": ObjectId(license_id)})
+        # Also takes the provisioned locals out of the dashboard totals
+        DashboardSummaryModel.remove_license(license_id)
+        UsageEventModel.remove_license(license_id)
+        UsageIdempotencyModel.remove_license(license_id)
@@ -0,0 +1,76 @@
+# auth_app/management/commands/benchmark_serialization.py
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from common.renderers import ORJSONRenderer
+from licenses.models.license_model import LicenseModel
+
+
+def _license_doc(index):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # as pymongo returns them
+    return {
+        "_id": ObjectId(),
+        "client": {"name": f"Client {index}", "contact_email": f"client{index}@example.com"},
+        "limits": {"scans": 1000, "users": 25},
+        "usage": {"scans": index % 1000, "users": index % 25},
+        "leased": {"scans": 0, "users": 0},
+        "expiry": now + timedelta(days=365),
+        "status": "active",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _stringified(doc):
+    """A license serialized the way it was before ORJSONRenderer (strings built by hand)."""
+    return {
+        **LicenseModel.serialize(doc),
+        "id": str(doc["_id"]),
+        "expiry": doc["expiry"].isoformat(),
+        "created_at": doc["created_at"].isoformat(),
+        "updated_at": doc["updated_at"].isoformat(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSONRenderer with ORJSONRenderer on a full page of licenses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size", type=int, default=getattr(settings, "API_MAX_PAGE_SIZE", 100),
+            help="Licenses per page (default: API_MAX_PAGE_SIZE)",
+        )
+        parser.add_argument("--rounds", type=int, default=500, help="Pages rendered per renderer")
+
+    def handle(self, *args, **options):
+        docs = [_license_doc(index) for index in range(options["page_size"])]
+        rounds = options["rounds"]
+        self.stdout.write(self.style.NOTICE(
+            f"Rendering {rounds} pages of {len(docs)} licenses with each renderer..."
+        ))
+
+        def stdlib_page():
+            page = {"licenses": [_stringified(doc) for doc in docs], "pagination": {}}
+            return JSONRenderer().render(page)
+
+        def orjson_page():
+            page = {"licenses": [LicenseModel.serialize(doc) for doc in docs], "pagination": {}}
+            return ORJSONRenderer().render(page)
+
+        results = {}
+        for name, render in (("JSONRenderer", stdlib_page), ("ORJSONRenderer", orjson_page)):
+            render()  # warm up
+            started = time.perf_counter()
+            for _ in range(rounds):
+                body = render()
+            results[name] = (time.perf_counter() - started) / rounds
+            self.stdout.write(f"  {name}: {results[name] * 1e6:.0f} µs/page, {len(body)} bytes")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"ORJSONRenderer is {results['JSONRenderer'] / results['ORJSONRenderer']:.1f}x faster"
+        ))
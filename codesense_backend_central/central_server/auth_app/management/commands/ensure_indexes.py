@@ -0,0 +1,23 @@
+# auth_app/management/commands/ensure_indexes.py
+from django.core.management.base import BaseCommand
+from pymongo.errors import PyMongoError
+from common.db.indexes import ensure_indexes, find_index_drift
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes declared in common.db.indexes"
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Ensuring MongoDB indexes..."))
+        try:
+            created = ensure_indexes()
+        except PyMongoError as e:
+            self.stderr.write(self.style.ERROR(f"Error: {e}"))
+            return
+
+        for collection, names in created.items():
+            self.stdout.write(f"{collection}: {', '.join(names)}")
+
+        for problem in find_index_drift():
+            self.stdout.write(self.style.WARNING(problem))
+
+        self.stdout.write(self.style.SUCCESS("Indexes are in place."))
@@ -0,0 +1,42 @@
+# auth_app/management/commands/import_licenses.py
+from django.core.management.base import BaseCommand
+from licenses.services.license_import import FORMATS, detect_format, import_licenses
+
+class Command(BaseCommand):
+    help = "Bulk-create licenses from a CSV or JSONL file (LicenseCreateSerializer fields)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with header row) or JSONL file")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, help="Rows per insert_many (LICENSE_IMPORT_BATCH_SIZE)")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or detect_format(options["path"])
+        if fmt not in FORMATS:
+            self.stderr.write(self.style.ERROR("Error: cannot tell the format, pass --format csv|jsonl"))
+            return
+
+        self.stdout.write(self.style.NOTICE(f"Importing licenses from {options['path']}..."))
+        try:
+            with open(options["path"], "rb") as stream:
+                report = import_licenses(
+                    stream, fmt, batch_size=options["batch_size"], dry_run=options["dry_run"]
+                )
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error: {e}"))
+            return
+
+        for error in report["errors"]:
+            details = "; ".join(
+                f"{field}: {', '.join(str(message) for message in messages)}"
+                for field, messages in error["errors"].items()
+            )
+            self.stdout.write(self.style.WARNING(f"row {error['row']}: {details}"))
+        if report["errors_truncated"]:
+            self.stdout.write(self.style.WARNING(f"... {report['failed'] - len(report['errors'])} more failed rows"))
+
+        verb = "valid" if options["dry_run"] else "imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['imported']} of {report['total_rows']} rows {verb}, {report['failed']} failed."
+        ))
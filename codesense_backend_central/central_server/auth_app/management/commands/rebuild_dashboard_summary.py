@@ -0,0 +1,14 @@
+# auth_app/management/commands/rebuild_dashboard_summary.py
+from django.core.management.base import BaseCommand
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard_summary collection from licenses, locals and users"
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Rebuilding dashboard summary..."))
+        try:
+            DashboardSummaryModel.rebuild()
+            self.stdout.write(self.style.SUCCESS("Dashboard summary rebuilt successfully!"))
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error: {e}"))
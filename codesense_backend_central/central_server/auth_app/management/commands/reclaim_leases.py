@@ -0,0 +1,14 @@
+# auth_app/management/commands/reclaim_leases.py
+from django.core.management.base import BaseCommand
+from licenses.models.lease_model import LeaseModel
+
+class Command(BaseCommand):
+    help = "Settle expired quota leases (charged in full); run on a schedule, e.g. every 5 minutes from cron"
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Reclaiming expired leases..."))
+        try:
+            reclaimed = LeaseModel.reclaim_expired()
+            self.stdout.write(self.style.SUCCESS(f"Reclaimed {reclaimed} expired lease(s)."))
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error: {e}"))
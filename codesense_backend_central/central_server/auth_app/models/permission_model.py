@@ -1,10 +1,72 @@
 # local/auth_app/models/permission_model.py
 
+import threading
+import time
 from datetime import datetime, timezone
-from common.db import MongoDBClient
+from django.conf import settings
+from common.db import MongoCollection, MongoDBClient
+from auth_app.permissions.bitmask import ALL_PERMISSIONS, PERMISSION_BITS, to_bitmask
+
+META_ID = "version"
+
+
+class PermissionCache:
+    """
+    In-process copy of every role's permissions. Roles are few, so the whole
+    collection is loaded at once; it is reloaded only when the version stamp
+    in `permissions_meta` changes, and the stamp itself is read at most every
+    PERMISSION_CACHE_CHECK_SECONDS. Between checks a lookup is a dict access.
+    """
+
+    def __init__(self, collection_name, meta_collection_name):
+        self._collection_name = collection_name
+        self._meta_collection_name = meta_collection_name
+        self._lock = threading.Lock()
+        self._roles = None
+        self._stamp = None
+        self._checked_at = 0.0
+
+    @property
+    def check_interval(self) -> float:
+        return getattr(settings, "PERMISSION_CACHE_CHECK_SECONDS", 5)
+
+    def _read_stamp(self):
+        meta = MongoDBClient.get_database()[self._meta_collection_name]
+        doc = meta.find_one({"_id": META_ID}, projection={"version": 1})
+        return doc.get("version", 0) if doc else 0
+
+    def _load(self) -> dict:
+        return {
+            doc["role"]: {
+                "permissions": doc.get("permissions", {}),
+                "version": doc.get("version", 0),
+            }
+            for doc in MongoDBClient.get_database()[self._collection_name].find({}, projection={"role": 1, "permissions": 1, "version": 1})
+        }
+
+    def roles(self, force: bool = False) -> dict:
+        roles = self._roles
+        if not force and roles is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return roles
+
+        with self._lock:
+            # Read the stamp before the roles: a write landing in between
+            # leaves an older stamp and is picked up by the next check
+            stamp = self._read_stamp()
+            if force or self._roles is None or stamp != self._stamp:
+                self._roles = self._load()
+                self._stamp = stamp
+            self._checked_at = time.monotonic()
+            return self._roles
+
+    def refresh(self) -> None:
+        self.roles(force=True)
+
 
 class PermissionModel:
-    collection = MongoDBClient.get_database()["permissions"]
+    collection = MongoCollection("permissions")
+    meta_collection = MongoCollection("permissions_meta")
+    cache = PermissionCache("permissions", "permissions_meta")
 
     @staticmethod
     def get_permissions_for_role(role: str) -> dict:
@@ -12,38 +74,48 @@ class PermissionModel:
             # Grant all possible permissions
             return {key: True for key in PermissionModel.get_all_permission_keys()}
 
-        doc = PermissionModel.collection.find_one({"role": role})
-        return doc.get("permissions", {}) if doc else {}
+        entry = PermissionModel.cache.roles().get(role)
+        return dict(entry["permissions"]) if entry else {}
+
+    @staticmethod
+    def get_bitmask_for_role(role: str) -> int:
+        """Permissions of a role as an integer (see auth_app.permissions.bitmask)."""
+        if role.lower() == "admin":
+            return ALL_PERMISSIONS
+        entry = PermissionModel.cache.roles().get(role)
+        return to_bitmask(entry["permissions"]) if entry else 0
+
+    @staticmethod
+    def get_role_version(role: str) -> int:
+        """Version of a role's permissions; bumped by every change."""
+        if role.lower() == "admin":
+            return 0  # admin always holds every permission
+        entry = PermissionModel.cache.roles().get(role)
+        return entry["version"] if entry else 0
 
     @staticmethod
     def set_permissions_for_role(role: str, permissions: dict):
         now = datetime.now(timezone.utc)
         PermissionModel.collection.update_one(
             {"role": role},
-            {"$set": {
-                "permissions": permissions,
-                "updated_at": now
-            }},
+            {
+                "$set": {
+                    "permissions": permissions,
+                    "updated_at": now
+                },
+                "$inc": {"version": 1},
+            },
             upsert=True
         )
+        # Other processes notice the new stamp on their next check
+        PermissionModel.meta_collection.update_one(
+            {"_id": META_ID},
+            {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        PermissionModel.cache.refresh()
 
     @staticmethod
     def get_all_permission_keys() -> list:
         """Return all supported permission keys."""
-        return [
-            "create_project",
-            "delete_project",
-            "update_project",
-            "view_projects",
-            "view_scans",
-            "create_scan",
-            "update_scan",
-            "delete_scan",
-            "view_findings",
-            "validate_finding",
-            "delete_finding",
-            "create_report",
-            "update_report",
-            "delete_report",
-            "view_reports",
-        ]
+        return list(PERMISSION_BITS)
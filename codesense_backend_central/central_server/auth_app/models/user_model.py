@@ -2,76 +2,68 @@
 
 from bson import ObjectId
 from datetime import datetime, timezone
-from common.db import MongoDBClient
+from common.db import MongoCollection
+from pymongo import ReturnDocument
 from pymongo.errors import PyMongoError
+from common.db.pagination import keyset_page, offset_page
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
 
 class UserModel:
-    collection = MongoDBClient.get_database()["users"]
+    collection = MongoCollection("users")
+    SORT_FIELDS = ("_id", "created_at", "email")
 
     @staticmethod
     def serialize_user(user):
         if not user:
             return None
         return {
-            "id": str(user.get("_id")),
+            "id": user.get("_id"),
             "email": user.get("email"),
             "name": user.get("name"),
             "role": user.get("role", "User"),
             "deleted": user.get("deleted", True),
-            "created_at": user["created_at"].isoformat() if user.get("created_at") else None,
-            "updated_at": user["updated_at"].isoformat() if user.get("updated_at") else None,
+            "created_at": user.get("created_at"),
+            "updated_at": user.get("updated_at"),
         }
 
     @staticmethod
-    def find_all(page=1, limit=10, role="user"):
+    def find_all(page=1, limit=10, role="user", cursor=None, sort="_id", total="exact"):
+        """
+        Page through active users. Passing `cursor` ("" for the first page)
+        switches from skip/limit to keyset pagination on (sort, _id).
+        """
+        empty_pagination = (
+            {"limit": limit, "next_cursor": None} if cursor is not None
+            else {"total": 0, "page": page, "limit": limit, "pages": 0}
+        )
         try:
-            skip = (page - 1) * limit
-
             if role == "manager":
                 # Exclude admin users
-                users_cursor = UserModel.collection.find(
-                    {"deleted": False, "role": {"$ne": "admin"}}
-                ).skip(skip).limit(limit)
-                total = UserModel.collection.count_documents({"deleted": False, "role": {"$ne": "admin"}})
+                query = {"deleted": False, "role": {"$ne": "admin"}}
             else:
-                users_cursor = UserModel.collection.find(
-                    {"deleted": False}
-                ).skip(skip).limit(limit)
-                total = UserModel.collection.count_documents({"deleted": False})
+                query = {"deleted": False}
 
-            users = [UserModel.serialize_user(u) for u in users_cursor]
+            if cursor is not None:
+                docs, pagination = keyset_page(UserModel.collection, query, cursor, limit, sort, total)
+            else:
+                docs, pagination = offset_page(UserModel.collection, query, page, limit, total)
 
             return {
-                "users": users,
-                "pagination": {
-                    "total": total,
-                    "page": page,
-                    "limit": limit,
-                    "pages": (total + limit - 1) // limit
-                }
+                "users": [UserModel.serialize_user(u) for u in docs],
+                "pagination": pagination,
             }
 
         except PyMongoError as e:
             return {
                 "users": [],
-                "pagination": {
-                    "total": 0,
-                    "page": page,
-                    "limit": limit,
-                    "pages": 0
-                },
+                "pagination": empty_pagination,
                 "error": "Database query failed. Please try again later."
             }
 
         except Exception as e:
             return {
                 "users": [],
-                "pagination": {
-                    "total": 0,
-                    "page": page,
-                    "limit": limit,
-                    "pages": 0
-                },
+                "pagination": empty_pagination,
                 "error": "Unexpected error occurred. Please contact support."
             }
     
@@ -103,20 +95,41 @@ class UserModel:
             "updated_at": now,
         }
         result = UserModel.collection.insert_one(user_data)
+        if not deleted:
+            DashboardSummaryModel.adjust_users(1)
         return UserModel.find_by_id(result.inserted_id)
 
     @staticmethod
     def update_user(user_id: str, update_data: dict):
         update_data["updated_at"] = datetime.now(timezone.utc)
-        UserModel.collection.update_one(
+        before = UserModel.collection.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"deleted": 1},
+            return_document=ReturnDocument.BEFORE,
         )
+        # Keep the dashboard's active users total in step with soft deletes
+        if before and "deleted" in update_data and before.get("deleted") != update_data["deleted"]:
+            DashboardSummaryModel.adjust_users(-1 if update_data["deleted"] else 1)
         return UserModel.find_by_id(user_id)
 
+    @staticmethod
+    def replace_password_hash(user_id, old_hash: str, new_hash: str) -> bool:
+        """Swap in a re-computed hash unless the password changed meanwhile."""
+        result = UserModel.collection.update_one(
+            {"_id": ObjectId(user_id), "password": old_hash},
+            {"$set": {"password": new_hash}},
+        )
+        return result.modified_count == 1
+
     @staticmethod
     def delete_user(user_id: str):
-        return UserModel.collection.delete_one({"_id": ObjectId(user_id)})
+        doc = UserModel.collection.find_one_and_delete(
+            {"_id": ObjectId(user_id)}, projection={"deleted": 1}
+        )
+        if doc and not doc.get("deleted"):
+            DashboardSummaryModel.adjust_users(-1)
+        return doc
 
     @staticmethod
     def exists(email: str) -> bool:
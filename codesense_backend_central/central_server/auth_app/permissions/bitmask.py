@@ -0,0 +1,49 @@
+# auth_app/permissions/bitmask.py
+
+# Stable bit index of every permission key. Tokens carry permissions as an
+# integer built from these bits, so an index must never be reused or
+# reordered: new keys get the next free index, removed keys keep theirs.
+PERMISSION_BITS = {
+    "create_project": 0,
+    "delete_project": 1,
+    "update_project": 2,
+    "view_projects": 3,
+    "view_scans": 4,
+    "create_scan": 5,
+    "update_scan": 6,
+    "delete_scan": 7,
+    "view_findings": 8,
+    "validate_finding": 9,
+    "delete_finding": 10,
+    "create_report": 11,
+    "update_report": 12,
+    "delete_report": 13,
+    "view_reports": 14,
+}
+
+ALL_PERMISSIONS = sum(1 << index for index in PERMISSION_BITS.values())
+
+
+def bit(permission_key: str) -> int:
+    """Mask of a single permission. Raises KeyError for unknown keys."""
+    return 1 << PERMISSION_BITS[permission_key]
+
+
+def to_bitmask(permissions: dict) -> int:
+    """{key: bool} -> int; unknown keys are ignored."""
+    mask = 0
+    for key, granted in permissions.items():
+        if granted and key in PERMISSION_BITS:
+            mask |= 1 << PERMISSION_BITS[key]
+    return mask
+
+
+def from_bitmask(mask: int) -> dict:
+    """int -> {key: bool} covering every registered key."""
+    return {key: bool(mask >> index & 1) for key, index in PERMISSION_BITS.items()}
+
+
+def has_permission(mask: int, permission_key: str) -> bool:
+    """False for unknown keys: nothing can grant a permission without a bit."""
+    index = PERMISSION_BITS.get(permission_key)
+    return index is not None and bool(mask >> index & 1)
@@ -1,27 +1,38 @@
 from rest_framework.response import Response
 from rest_framework import status
 from functools import wraps
-from auth_app.utils.jwt import decode_token
 from auth_app.models.permission_model import PermissionModel
+from auth_app.permissions.bitmask import has_permission
+
+
+def _authenticate(request):
+    """
+    Token claims of the request's user, resolved by DRF's JWTAuthentication
+    (once per request, memoized on `request.user`). Returns (user, None) or
+    (None, error Response).
+    """
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None, Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    user = request.user
+    if not getattr(user, "is_authenticated", False):
+        return None, Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+    return user, None
+
 
 def require_role(*allowed_roles):
     def decorator(view_method):
         @wraps(view_method)
         def _wrapped_view(self, request, *args, **kwargs):  # Use `self` not `view`
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
-                return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-            
-            token = auth_header.split(" ")[1]
-            payload = decode_token(token)
-            if not payload:
-                return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+            user, error = _authenticate(request)
+            if error:
+                return error
 
-            role = payload.get("role", "").lower()
+            role = user.get("role", "").lower()
             if role not in [r.lower() for r in allowed_roles]:
                 return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
-            
-            request.user = payload  # Attach user to request
+
             return view_method(self, request, *args, **kwargs)  # self = view class instance
 
         return _wrapped_view
@@ -32,40 +43,37 @@ def require_authentication():
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(view, request, *args, **kwargs):
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
-                return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-            
-            token = auth_header.split(" ")[1]
-            payload = decode_token(token)
-            if not payload:
-                return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
-            
-            request.user = payload
+            user, error = _authenticate(request)
+            if error:
+                return error
+
             return view_func(view, request, *args, **kwargs)
         return _wrapped_view
     return decorator
 
 def require_permission(permission_key):
+    # A key missing from auth_app.permissions.bitmask is never granted: 403
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(view, request, *args, **kwargs):
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
-                return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-            
-            token = auth_header.split(" ")[1]
-            payload = decode_token(token)
-            if not payload:
-                return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
+            user, error = _authenticate(request)
+            if error:
+                return error
 
-            role = payload.get("role")
-            
-            permissions = PermissionModel.get_permissions_for_role(role)
-            if not permissions.get(permission_key):
+            role = user.get("role", "")
+
+            if "perms" in user:
+                # Permissions travel in the token; `pv` pins the role version
+                # they were issued for, a changed role forces a new login
+                if user.get("pv") != PermissionModel.get_role_version(role):
+                    return Response({"error": "Permissions changed, please log in again"}, status=status.HTTP_401_UNAUTHORIZED)
+                allowed = has_permission(user["perms"], permission_key)
+            else:
+                # Tokens issued before the `perms` claim existed
+                allowed = PermissionModel.get_permissions_for_role(role).get(permission_key)
+            if not allowed:
                 return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-            
-            request.user = payload
+
             return view_func(view, request, *args, **kwargs)
         return _wrapped_view
     return decorator
@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework import status
+from rest_framework.response import Response
 
-# Create your tests here.
+from auth_app.permissions.bitmask import ALL_PERMISSIONS, bit, has_permission
+from auth_app.permissions.decorators import require_permission
+from auth_app.utils.django_user_proxy import AuthenticatedUser
+
+
+class HasPermissionTest(SimpleTestCase):
+
+    def test_granted_bit(self):
+        self.assertTrue(has_permission(bit("view_scans"), "view_scans"))
+        self.assertFalse(has_permission(bit("view_scans"), "delete_scan"))
+
+    def test_unknown_key_is_denied(self):
+        self.assertFalse(has_permission(ALL_PERMISSIONS, "view_scan"))
+
+
+class RequirePermissionTest(SimpleTestCase):
+    """Admin tokens skip the role lookup (version 0), so no database is needed."""
+
+    def _call(self, permission_key):
+        @require_permission(permission_key)
+        def view(view, request):
+            return Response({"ok": True})
+
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION="Bearer token")
+        request.user = AuthenticatedUser({"id": "u1", "role": "admin", "perms": ALL_PERMISSIONS, "pv": 0})
+        return view(None, request)
+
+    def test_known_permission_is_allowed(self):
+        self.assertEqual(self._call("view_scans").status_code, status.HTTP_200_OK)
+
+    def test_unknown_permission_is_denied(self):
+        self.assertEqual(self._call("view_scan").status_code, status.HTTP_403_FORBIDDEN)
@@ -15,6 +15,16 @@ class AuthenticatedUser:
     def to_dict(self):
         return self._payload
 
+    # Dict-style access to the token claims, e.g. request.user.get("role")
+    def get(self, key, default=None):
+        return self._payload.get(key, default)
+
+    def __getitem__(self, key):
+        return self._payload[key]
+
+    def __contains__(self, key):
+        return key in self._payload
+
     def __str__(self):
         return f"AuthenticatedUser(id={self.id}, role={self.role})"
 
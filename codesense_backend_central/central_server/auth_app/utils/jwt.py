@@ -1,8 +1,12 @@
+import hashlib
 import jwt
 from datetime import datetime, timezone, timedelta
+from django.conf import settings
 from dotenv import load_dotenv
 import os
 
+from common.lru import LRUCache
+
 load_dotenv()
 
 JWT_SECRET = os.getenv("JWT_TOKEN_SECRET", "nodeBetter+ImLe@theragicToThis")
@@ -14,10 +18,23 @@ def generate_token(payload):
     payload["exp"] = datetime.now(timezone.utc) + timedelta(minutes=JWT_EXP_MINUTES)
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGO)
 
+# Verified tokens by sha256 digest; an entry expires with the token's `exp`
+_verified_tokens = LRUCache(maxsize=getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10000))
+
+
 def decode_token(token: str):
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = _verified_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
+
+    if "exp" in payload:
+        _verified_tokens.set(key, payload, expires_at=payload["exp"])
+    return dict(payload)
@@ -1,7 +1,12 @@
 # local/auth_app/utils/password.py
 import bcrypt
+import os
 import re
-from rest_framework.exceptions import ValidationError
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
 
 def validate_strong_password(password: str):
     if len(password) < 8:
@@ -16,9 +21,65 @@ def validate_strong_password(password: str):
         raise ValidationError("Password must contain at least one special character (@, $, !, %, *, ?, &).")
     return True
 
+class PasswordHasherBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password checks in progress, please retry shortly."
+    default_code = "password_hasher_busy"
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL),
+    so a burst of logins uses at most BCRYPT_WORKERS cores. At most
+    BCRYPT_QUEUE_SIZE further calls may wait; beyond that callers get
+    PasswordHasherBusy (503) straight away instead of piling up.
+    The pool is created per process, on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = None
+
+    def _pool(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    workers = getattr(settings, "BCRYPT_WORKERS", 2)
+                    queue_size = getattr(settings, "BCRYPT_QUEUE_SIZE", 32)
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+                    self._slots = threading.BoundedSemaphore(workers + queue_size)
+                    self._pid = os.getpid()
+        return self._executor, self._slots
+
+    def run(self, fn, *args):
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            slots.release()
+
+
+_hasher = PasswordHasher()
+
+
+def bcrypt_rounds() -> int:
+    return getattr(settings, "BCRYPT_ROUNDS", 12)
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=bcrypt_rounds())
+    return _hasher.run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    return _hasher.run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash ($2b$<cost>$...) uses a cost other than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != bcrypt_rounds()
+    except (IndexError, ValueError):
+        return True
 
@@ -5,7 +5,7 @@ from rest_framework import status
 from auth_app.serializers.user_serializer import LoginSerializer
 from auth_app.models.user_model import UserModel
 from auth_app.models.permission_model import PermissionModel
-from auth_app.utils.password import verify_password
+from auth_app.utils.password import PasswordHasherBusy, hash_password, needs_rehash, verify_password
 from auth_app.utils.jwt import generate_token
 from auth_app.permissions.decorators import require_role, require_authentication
 
@@ -21,6 +21,12 @@ class GetMyPermissionsView(APIView):
     def get(self, request):
         user = request.user
         role = user.get("role", "admin")
+        if request.query_params.get("as") == "bitmask":
+            return Response({
+                "role": role,
+                "perms": PermissionModel.get_bitmask_for_role(role),
+                "pv": PermissionModel.get_role_version(role),
+            }, status=status.HTTP_200_OK)
         permissions = PermissionModel.get_permissions_for_role(role)
         return Response({"role": role, "permissions": permissions}, status=status.HTTP_200_OK)
 
@@ -58,10 +64,20 @@ class LoginView(APIView):
         if not verify_password(data["password"], user["password"]):
             return Response({"detail": "Incorrect password, please use vaild credentials"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Move the stored hash to the configured bcrypt cost while we have the password
+        if needs_rehash(user["password"]):
+            try:
+                UserModel.replace_password_hash(user["_id"], user["password"], hash_password(data["password"]))
+            except PasswordHasherBusy:
+                pass  # not worth failing the login for; retried on the next one
+
         searlized_user = UserModel.serialize_user(user=user)
         token = generate_token({
             "id": str(user["_id"]),
             "role": user["role"],
+            # Permission bitmask and the role version it was built from
+            "perms": PermissionModel.get_bitmask_for_role(user["role"]),
+            "pv": PermissionModel.get_role_version(user["role"]),
         })
         return Response({
             "token": token, "user": searlized_user
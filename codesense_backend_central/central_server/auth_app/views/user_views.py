@@ -9,6 +9,7 @@ from auth_app.serializers.user_serializer import RegisterUserSerializer, UpdateU
 from auth_app.models.user_model import UserModel
 from auth_app.permissions.decorators import require_role, require_authentication
 from auth_app.utils.password import hash_password, validate_strong_password
+from common.db.pagination import parse_page_params
 
 class ProfileView(APIView):
     @require_authentication()
@@ -107,14 +108,16 @@ class UserModuleView(APIView):
    
     @require_role("Admin", "Manager")
     def get(self, request):
-        page = int(request.query_params.get("page", 1))
-        limit = int(request.query_params.get("limit", 10))
+        try:
+            params = parse_page_params(request.query_params, UserModel.SORT_FIELDS)
+        except ValueError as e:
+            return Response({"error": f"Invalid pagination parameters: {e}"}, status=status.HTTP_400_BAD_REQUEST)
  
         user = request.user
         user_role = user.get("role", "")
 
         if user_role == "manager":
-            all_users = UserModel.find_all(page=page, limit=limit, role="manager")
+            all_users = UserModel.find_all(role="manager", **params)
         else:
-            all_users = UserModel.find_all(page=page, limit=limit, role="admin")
+            all_users = UserModel.find_all(role="admin", **params)
         return Response(all_users, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -59,6 +59,23 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'central_server.urls'
 
+REST_FRAMEWORK = {
+    # Bearer token verified once per request; see auth_app.JWTAuthentication
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'auth_app.JWTAuthentication',
+    ],
+    # orjson; ObjectId and datetime values are encoded directly (see common.serialization)
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -90,6 +107,45 @@ DATABASES = {
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+# Keyword arguments for MongoClient (and the async client). None leaves
+# pymongo's default in place.
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 100)),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+    "maxIdleTimeMS": _optional_int("MONGO_MAX_IDLE_TIME_MS"),
+    "waitQueueTimeoutMS": _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 20000)),
+    "socketTimeoutMS": _optional_int("MONGO_SOCKET_TIMEOUT_MS"),
+    # e.g. "zstd,snappy,zlib"; zstd and snappy need their optional packages
+    "compressors": os.getenv("MONGO_COMPRESSORS") or None,
+}
+# Pre-open minPoolSize connections in each gunicorn worker before it takes
+# traffic (see gunicorn.conf.py)
+MONGO_WARM_UP = os.getenv("MONGO_WARM_UP", "true").lower() == "true"
+
+# Warn in `manage.py check --deploy` when live indexes drift from common.db.indexes
+# (`manage.py ensure_indexes` reports drift too)
+MONGO_CHECK_INDEXES = os.getenv("MONGO_CHECK_INDEXES", "true").lower() == "true"
+
+# Response cache for polled endpoints (dashboard, license list).
+# Use a shared backend (Redis/Memcached) when running several workers so a
+# write in one worker invalidates the cached responses of all of them.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", 'central-server'),
+    }
+}
+
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", 15))  # seconds, 0 disables
+
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 100))  # upper bound on ?limit=
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:9000",
     "http://127.0.0.1:9000",
@@ -134,7 +190,69 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# bcrypt cost factor for new hashes; logins rehash stored hashes to match
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Threads per process running bcrypt, and how many more calls may wait for
+# one before requests are refused with 503
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", 2))
+BCRYPT_QUEUE_SIZE = int(os.getenv("BCRYPT_QUEUE_SIZE", 32))
+
+# Max verified auth tokens kept in memory (each entry expires with its token)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+# Seconds between checks of the role permissions version stamp; changes
+# made in other processes become visible within this window
+PERMISSION_CACHE_CHECK_SECONDS = int(os.getenv("PERMISSION_CACHE_CHECK_SECONDS", 5))
+
 CENTRAL_KEYS_DIR = os.getenv("CENTRAL_KEYS_DIR")
+# Seconds between mtime checks of the cached root key files
+ROOT_KEYS_CHECK_INTERVAL = int(os.getenv("ROOT_KEYS_CHECK_INTERVAL", 5))
+# Max parsed local public keys kept in memory for assertion checks
+LOCAL_KEY_CACHE_SIZE = int(os.getenv("LOCAL_KEY_CACHE_SIZE", 10000))
+# Lifetime of a handshake challenge nonce
+CHALLENGE_TTL_SECONDS = int(os.getenv("CHALLENGE_TTL_SECONDS", 60))
+# "db": nonces stored in Mongo; "stateless": HMAC-signed challenge tokens,
+# no database I/O on /api/local/challenge/ (see licenses.services.challenges)
+CHALLENGE_MODE = os.getenv("CHALLENGE_MODE", "db")
+CHALLENGE_TOKEN_SECRET = os.getenv("CHALLENGE_TOKEN_SECRET")  # defaults to SECRET_KEY
+CHALLENGE_REPLAY_CACHE_SIZE = int(os.getenv("CHALLENGE_REPLAY_CACHE_SIZE", 100000))
+
+# Serve provision/challenge/assertion/update-usage from the async views on
+# pymongo's async client. Enable only when running under ASGI
+# (uvicorn central_server.asgi:application); under WSGI they would run
+# through Django's async adapter and be slower than the sync views
+ASYNC_LOCAL_HANDSHAKE = os.getenv("ASYNC_LOCAL_HANDSHAKE", "false").lower() == "true"
+
+# Batched usage reporting (/api/local/update-usage/batch/)
+USAGE_BATCH_MAX_EVENTS = int(os.getenv("USAGE_BATCH_MAX_EVENTS", 500))
+USAGE_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("USAGE_IDEMPOTENCY_TTL_SECONDS", 86400))  # replay window
+
+# Quota leases (/api/local/lease/): blocks of scans/users a local spends
+# without calling central. Size = observed rate * duration * headroom,
+# clamped to [LEASE_MIN_UNITS, LEASE_MAX_UNITS]. Expired leases are charged
+# in full and reclaimed when a limit check would otherwise fail; also run
+# `manage.py reclaim_leases` on a schedule, e.g. cron:
+#   */5 * * * * cd /srv/central_server && python manage.py reclaim_leases
+LEASE_DURATION_SECONDS = int(os.getenv("LEASE_DURATION_SECONDS", 300))
+LEASE_INITIAL_UNITS = int(os.getenv("LEASE_INITIAL_UNITS", 10))
+LEASE_MIN_UNITS = int(os.getenv("LEASE_MIN_UNITS", 1))
+LEASE_MAX_UNITS = int(os.getenv("LEASE_MAX_UNITS", 1000))
+LEASE_HEADROOM = float(os.getenv("LEASE_HEADROOM", 1.5))
+
+# Bulk license import (/api/licenses/import/, manage.py import_licenses)
+LICENSE_IMPORT_BATCH_SIZE = int(os.getenv("LICENSE_IMPORT_BATCH_SIZE", 1000))
+LICENSE_IMPORT_MAX_ERRORS = int(os.getenv("LICENSE_IMPORT_MAX_ERRORS", 1000))  # rows listed in the report
+
+# Signed license configs kept in memory per license (see license_config)
+LICENSE_CONFIG_CACHE_SIZE = int(os.getenv("LICENSE_CONFIG_CACHE_SIZE", 10000))
+
+# Bulk config export (/api/licenses/config/export/): licenses read and signed
+# per batch, on this many threads
+LICENSE_EXPORT_BATCH_SIZE = int(os.getenv("LICENSE_EXPORT_BATCH_SIZE", 200))
+LICENSE_EXPORT_WORKERS = int(os.getenv("LICENSE_EXPORT_WORKERS", 4))
+
+# Raw usage ledger entries are dropped after this many days; the hourly and
+# daily rollups in usage_rollups are kept
+USAGE_EVENT_TTL_DAYS = int(os.getenv("USAGE_EVENT_TTL_DAYS", 30))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
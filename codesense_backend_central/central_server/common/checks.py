@@ -0,0 +1,35 @@
+# common/checks.py
+
+from django.conf import settings
+from django.core.checks import Warning, register
+from pymongo.errors import PyMongoError
+
+
+@register(deploy=True)
+def check_mongo_indexes(app_configs, **kwargs):
+    """
+    Warn when the live MongoDB indexes drift from common.db.indexes.
+    Deploy-only (`check --deploy`): it has to reach MongoDB, which every
+    other management command would otherwise wait on.
+    """
+    if not getattr(settings, "MONGO_CHECK_INDEXES", True):
+        return []
+
+    from common.db.indexes import find_index_drift
+
+    try:
+        problems = find_index_drift()
+    except (PyMongoError, ConnectionError) as e:
+        return [Warning(
+            f"Could not verify MongoDB indexes: {e}",
+            id="common.W002",
+        )]
+
+    return [
+        Warning(
+            problem,
+            hint="Run `python manage.py ensure_indexes`.",
+            id="common.W001",
+        )
+        for problem in problems
+    ]
@@ -1,29 +1,93 @@
 # common/db/__init__.py
 
+from concurrent.futures import ThreadPoolExecutor
 from pymongo import MongoClient, errors
 from django.conf import settings
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+
+def client_options() -> dict:
+    """
+    MongoClient keyword arguments from settings.MONGO_CLIENT_OPTIONS
+    (pool sizes, timeouts, compressors). Unset (None) options are left to
+    pymongo's defaults.
+    """
+    options = {"serverSelectionTimeoutMS": 5000}
+    options.update(getattr(settings, "MONGO_CLIENT_OPTIONS", {}))
+    return {name: value for name, value in options.items() if value is not None}
+
+
 class MongoDBClient:
+    """
+    One MongoClient per process. A client inherited through fork() (e.g.
+    gunicorn --preload) is not safe to use, so the owning PID is recorded
+    and a worker that finds a different one builds its own client.
+    """
     _instance = None
+    _pid = None
 
     def __new__(cls):
-        if cls._instance is None:
+        if cls._instance is None or cls._pid != os.getpid():
             try:
                 mongo_uri = getattr(settings, "MONGO_URI", "mongodb://localhost:27017")
-                client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+                client = MongoClient(mongo_uri, **client_options())
                 client.admin.command("ping")
                 cls._instance = client
+                cls._pid = os.getpid()
                 logger.info("MongoDB connection established.")
             except errors.ServerSelectionTimeoutError as e:
                 logger.error(f"MongoDB connection failed: {e}")
                 raise ConnectionError("Could not connect to MongoDB server.")
         return cls._instance
 
+    @classmethod
+    def warm_up(cls) -> int:
+        """
+        Open `minPoolSize` connections now instead of on the first requests:
+        that many concurrent pings each check out their own connection.
+        Returns the number of pings sent.
+        """
+        client = cls()
+        size = client.options.pool_options.min_pool_size
+        if size > 1:
+            with ThreadPoolExecutor(max_workers=size) as pool:
+                list(pool.map(lambda _: client.admin.command("ping"), range(size)))
+        return size
+
     @classmethod
     def get_database(cls, db_name=None):
         client = cls()
         db_name = db_name or getattr(settings, "MONGO_DB_NAME", "cls_codesense")
         return client[db_name]
+
+
+class MongoCollection:
+    """
+    Class attribute resolving to a collection on first access, so importing
+    a model never touches the network:
+
+        class LicenseModel:
+            collection = MongoCollection("licenses")
+
+    The collection is looked up again whenever MongoDBClient holds a new
+    client or MONGO_DB_NAME changes (e.g. tests overriding it).
+    """
+
+    def __init__(self, name, db_name=None):
+        self.name = name
+        self.db_name = db_name
+        self._client = None
+        self._resolved_db_name = None
+        self._collection = None
+
+    def __get__(self, instance, owner):
+        client = MongoDBClient()
+        db_name = self.db_name or getattr(settings, "MONGO_DB_NAME", "cls_codesense")
+        if client is not self._client or db_name != self._resolved_db_name:
+            self._collection = MongoDBClient.get_database(db_name)[self.name]
+            self._client = client
+            self._resolved_db_name = db_name
+        return self._collection
@@ -0,0 +1,37 @@
+# common/db/async_client.py
+
+import asyncio
+import logging
+import weakref
+
+from django.conf import settings
+from pymongo import AsyncMongoClient
+
+from . import client_options
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMongoDBClient:
+    """
+    pymongo's native asyncio client for the views served under ASGI.
+    An AsyncMongoClient belongs to the event loop it was first used on, so
+    one client is kept per running loop (normally one per ASGI worker).
+    """
+    _clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def get_client(cls) -> AsyncMongoClient:
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None:
+            mongo_uri = getattr(settings, "MONGO_URI", "mongodb://localhost:27017")
+            client = AsyncMongoClient(mongo_uri, **client_options())
+            cls._clients[loop] = client
+            logger.info("Async MongoDB client created.")
+        return client
+
+    @classmethod
+    def get_database(cls, db_name=None):
+        db_name = db_name or getattr(settings, "MONGO_DB_NAME", "cls_codesense")
+        return cls.get_client()[db_name]
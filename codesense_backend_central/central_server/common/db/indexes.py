@@ -0,0 +1,132 @@
+# common/db/indexes.py
+
+from django.conf import settings
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from . import MongoDBClient
+
+# Single source of truth for every index the application relies on,
+# keyed by collection name. `manage.py ensure_indexes` creates them and the
+# `common` system check warns when the live indexes drift from this set.
+DECLARED_INDEXES = {
+    "licenses": [
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        IndexModel([("expiry", ASCENDING), ("_id", ASCENDING)], name="expiry_id"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "locals": [
+        # Handshake lookups (get_by_local_id, challenge requests)
+        IndexModel([("local_id", ASCENDING)], name="local_id_unique", unique=True),
+        # Covers LocalModel.HANDSHAKE_FIELDS, so assertions never fetch the document
+        IndexModel(
+            [("local_id", ASCENDING), ("license_id", ASCENDING), ("status", ASCENDING), ("public_key", ASCENDING)],
+            name="local_id_handshake",
+        ),
+        # Dashboard locals count and get_by_license
+        IndexModel([("license_id", ASCENDING)], name="license_id"),
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+    ],
+    "users": [
+        # find_by_email; only one active (not deleted) account per email
+        IndexModel(
+            [("email", ASCENDING), ("deleted", ASCENDING)],
+            name="email_active_unique",
+            unique=True,
+            partialFilterExpression={"deleted": False},
+        ),
+        IndexModel([("deleted", ASCENDING), ("_id", ASCENDING)], name="deleted_id"),
+    ],
+    "permissions": [
+        IndexModel([("role", ASCENDING)], name="role_unique", unique=True),
+    ],
+    "dashboard_summary": [
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ],
+    "challenges": [
+        # Unanswered challenges disappear once expired
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "usage_events": [
+        IndexModel(
+            [("ts", ASCENDING)],
+            name="ts_ttl",
+            expireAfterSeconds=getattr(settings, "USAGE_EVENT_TTL_DAYS", 30) * 86400,
+        ),
+        IndexModel([("license_id", ASCENDING), ("ts", ASCENDING)], name="license_id_ts"),
+    ],
+    "usage_rollups": [
+        IndexModel(
+            [("license_id", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)],
+            name="license_granularity_bucket_unique",
+            unique=True,
+        ),
+    ],
+    "usage_idempotency": [
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=getattr(settings, "USAGE_IDEMPOTENCY_TTL_SECONDS", 86400),
+        ),
+    ],
+    "leases": [
+        # reclaim_expired; settled leases are kept as history
+        IndexModel(
+            [("status", ASCENDING), ("expires_at", ASCENDING)],
+            name="status_expires_at",
+        ),
+        IndexModel([("license_id", ASCENDING), ("status", ASCENDING)], name="license_id_status"),
+    ],
+}
+
+# Options that change an index's behaviour and therefore count as drift
+_COMPARED_OPTIONS = ("unique", "partialFilterExpression", "expireAfterSeconds", "sparse")
+
+
+def _spec(document: dict) -> dict:
+    spec = {"key": [(field, direction) for field, direction in document["key"].items()]}
+    for option in _COMPARED_OPTIONS:
+        if option in document:
+            spec[option] = document[option]
+    return spec
+
+
+def _live_spec(info: dict) -> dict:
+    # The server may report numeric directions as floats (1.0)
+    spec = {"key": [
+        (field, direction if isinstance(direction, str) else int(direction))
+        for field, direction in info["key"]
+    ]}
+    for option in _COMPARED_OPTIONS:
+        if option in info:
+            spec[option] = info[option]
+    return spec
+
+
+def ensure_indexes(db=None) -> dict:
+    """Create every declared index. Returns {collection: [index names]}."""
+    db = db if db is not None else MongoDBClient.get_database()
+    return {
+        name: db[name].create_indexes(indexes)
+        for name, indexes in DECLARED_INDEXES.items()
+    }
+
+
+def find_index_drift(db=None) -> list:
+    """Describe every difference between the declared and the live indexes."""
+    db = db if db is not None else MongoDBClient.get_database()
+    problems = []
+    for collection, indexes in DECLARED_INDEXES.items():
+        live = db[collection].index_information()
+        declared = {index.document["name"]: _spec(index.document) for index in indexes}
+
+        for name, spec in declared.items():
+            if name not in live:
+                problems.append(f"{collection}: missing index '{name}'")
+            elif _live_spec(live[name]) != spec:
+                problems.append(f"{collection}: index '{name}' differs from its declaration")
+
+        for name in live:
+            if name != "_id_" and name not in declared:
+                problems.append(f"{collection}: undeclared index '{name}'")
+    return problems
@@ -0,0 +1,140 @@
+# common/db/pagination.py
+
+import base64
+import binascii
+
+from bson import json_util
+from bson.errors import BSONError
+from django.conf import settings
+
+DEFAULT_PAGE_SIZE = 10
+TOTAL_MODES = ("exact", "estimated", "none")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def max_page_size() -> int:
+    return getattr(settings, "API_MAX_PAGE_SIZE", 100)
+
+
+def clamp_limit(limit) -> int:
+    return max(1, min(int(limit), max_page_size()))
+
+
+def encode_cursor(doc: dict, sort_key: str = "_id") -> str:
+    """Opaque cursor pointing just after `doc` in (sort_key, _id) order."""
+    payload = {"k": sort_key, "id": doc["_id"]}
+    if sort_key != "_id":
+        payload["v"] = doc.get(sort_key)
+    raw = json_util.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str = "_id") -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json_util.loads(raw)
+    except (binascii.Error, ValueError, TypeError, BSONError):
+        # BSONError: e.g. InvalidId for a tampered {"$oid": ...}
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(payload, dict) or "id" not in payload:
+        raise InvalidCursor("Malformed cursor")
+    if payload.get("k") != sort_key:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return payload
+
+
+def parse_page_params(params, sort_fields=("_id",)) -> dict:
+    """
+    Validate list query params into keyword arguments for the model list
+    methods. `?cursor=` (empty for the first page) selects keyset mode,
+    otherwise the classic `?page=` mode is used. Raises ValueError.
+    """
+    limit = clamp_limit(params.get("limit", DEFAULT_PAGE_SIZE))
+    total = params.get("total", "exact")
+    if total not in TOTAL_MODES:
+        raise ValueError(f"total must be one of: {', '.join(TOTAL_MODES)}")
+
+    if "cursor" in params:
+        sort = params.get("sort", "_id")
+        if sort not in sort_fields:
+            raise ValueError(f"sort must be one of: {', '.join(sort_fields)}")
+        cursor = params.get("cursor") or ""
+        if cursor:
+            decode_cursor(cursor, sort)
+        return {"cursor": cursor, "limit": limit, "sort": sort, "total": total}
+
+    page = int(params.get("page", 1))
+    if page < 1:
+        raise ValueError("page must be >= 1")
+    return {"page": page, "limit": limit, "total": total}
+
+
+def count_total(collection, query: dict, mode: str = "exact"):
+    """
+    Total for a listing. "estimated" reads collection metadata, which
+    cannot apply a filter, so filtered listings count exactly instead;
+    "none" skips it.
+    """
+    if mode == "estimated" and not query:
+        return collection.estimated_document_count()
+    if mode in ("exact", "estimated"):
+        return collection.count_documents(query)
+    return None
+
+
+def keyset_page(collection, query: dict, cursor: str = "", limit: int = DEFAULT_PAGE_SIZE,
+                sort_key: str = "_id", total: str = "exact"):
+    """
+    Fetch one page ordered by (sort_key, _id) starting after `cursor`.
+    Returns (docs, pagination) where pagination carries `next_cursor`
+    (None on the last page) and, unless disabled, `total`. Null or missing
+    sort values sort first, as in MongoDB, and are paged by `_id`.
+    """
+    limit = clamp_limit(limit)
+    filter_ = query
+    if cursor:
+        last = decode_cursor(cursor, sort_key)
+        if sort_key == "_id":
+            after = {"_id": {"$gt": last["id"]}}
+        elif last.get("v") is None:
+            # `$gt: null` matches nothing: finish the null run, then every non-null value
+            after = {"$or": [
+                {sort_key: None, "_id": {"$gt": last["id"]}},
+                {sort_key: {"$ne": None}},
+            ]}
+        else:
+            after = {"$or": [
+                {sort_key: {"$gt": last.get("v")}},
+                {sort_key: last.get("v"), "_id": {"$gt": last["id"]}},
+            ]}
+        filter_ = {"$and": [query, after]} if query else after
+
+    sort = [(sort_key, 1)] if sort_key == "_id" else [(sort_key, 1), ("_id", 1)]
+    docs = list(collection.find(filter_).sort(sort).limit(limit + 1))
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    pagination = {
+        "limit": limit,
+        "next_cursor": encode_cursor(docs[-1], sort_key) if has_more else None,
+    }
+    count = count_total(collection, query, total)
+    if count is not None:
+        pagination["total"] = count
+    return docs, pagination
+
+
+def offset_page(collection, query: dict, page: int = 1, limit: int = DEFAULT_PAGE_SIZE,
+                total: str = "exact"):
+    """Classic skip/limit page kept for the frontend's numbered pagination."""
+    limit = clamp_limit(limit)
+    docs = list(collection.find(query).skip((page - 1) * limit).limit(limit))
+    count = count_total(collection, query, total)
+    pagination = {"total": count} if count is not None else {}
+    pagination.update({"page": page, "limit": limit})
+    if count is not None:
+        pagination["pages"] = (count + limit - 1) // limit
+    return docs, pagination
@@ -0,0 +1,16 @@
+# common/parsers.py
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """Drop-in for DRF's JSONParser on orjson."""
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
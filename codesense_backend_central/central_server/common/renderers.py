@@ -0,0 +1,17 @@
+# common/renderers.py
+
+from rest_framework.renderers import BaseRenderer
+
+from common.serialization import dumps
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in for DRF's JSONRenderer on orjson (see common.serialization.dumps)."""
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
@@ -0,0 +1,103 @@
+# common/response_cache.py
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from common.serialization import dumps
+
+KEY_PREFIX = "response_cache"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+
+
+def _generation():
+    """
+    Current cache generation. Every cached response is stored under it as the
+    cache `version`, so bumping it invalidates all of them at once.
+    Seeded from the clock so a lost counter never reuses an old generation.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_response_cache():
+    """Drop every cached response. Called by the model write paths."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Counter missing: nothing was cached under it, just start a new one
+        _generation()
+
+
+def _make_etag(namespace, path, last_modified, generation):
+    stamp = last_modified.isoformat() if last_modified else ""
+    digest = hashlib.sha256(f"{namespace}|{path}|{stamp}|{generation}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def _render(response):
+    if isinstance(response, Response):
+        return dumps(response.data)
+    return response.content
+
+
+def cache_response(namespace, last_modified):
+    """
+    Cache a view's 200 JSON body for `API_CACHE_TTL` seconds.
+
+    `last_modified` returns the newest `updated_at` of the data behind the
+    view; it feeds the strong ETag together with the cache generation, so a
+    poll carrying a matching If-None-Match gets a 304 straight from cache.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def _wrapped_view(self, request, *args, **kwargs):
+            ttl = getattr(settings, "API_CACHE_TTL", 0)
+            if ttl <= 0:
+                return view_method(self, request, *args, **kwargs)
+
+            path = request.get_full_path()
+            key = f"{KEY_PREFIX}:{namespace}:{path}"
+            generation = _generation()
+
+            entry = cache.get(key, version=generation)
+            if entry is None:
+                # Read the stamp first so a write racing the view bumps the
+                # generation rather than hiding behind a newer stamp
+                stamp = last_modified()
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                entry = {
+                    "etag": _make_etag(namespace, path, stamp, generation),
+                    "body": _render(response),
+                }
+                cache.set(key, entry, timeout=ttl, version=generation)
+
+            if _etag_matches(request, entry["etag"]):
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(entry["body"], content_type="application/json")
+            response["ETag"] = entry["etag"]
+            response["Cache-Control"] = "no-cache"  # always revalidate with the ETag
+            return response
+
+        return _wrapped_view
+    return decorator
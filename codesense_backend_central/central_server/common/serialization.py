@@ -0,0 +1,50 @@
+# common/serialization.py
+
+import json
+from datetime import date, datetime
+
+import orjson
+from bson import ObjectId
+from rest_framework.utils.encoders import JSONEncoder
+
+_drf_encoder = JSONEncoder()
+
+
+def default(obj):
+    """orjson fallback: ObjectId as its hex string, then whatever DRF's encoder handles."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return _drf_encoder.default(obj)
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    """
+    Fast JSON for API output. datetimes render like `.isoformat()` and
+    ObjectIds as hex strings, so documents need no hand conversion.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=default, option=option)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+def _canonical_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def canonical_json(payload) -> bytes:
+    """
+    Bytes that get signed. Must stay byte-for-byte equal to
+    `json.dumps(payload, sort_keys=True)` (stdlib separators, ASCII
+    escaping), which is what locals recompute to verify a signature, so
+    this deliberately stays on the stdlib rather than orjson.
+    """
+    return json.dumps(payload, sort_keys=True, default=_canonical_default).encode("utf-8")
@@ -0,0 +1,27 @@
+import base64
+
+from django.test import SimpleTestCase
+
+from common.db.pagination import InvalidCursor, decode_cursor, parse_page_params
+
+
+def _cursor(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class DecodeCursorTest(SimpleTestCase):
+    """Tampered cursors must surface as InvalidCursor (a 400), never a 500."""
+
+    def test_malformed_object_id_is_invalid_cursor(self):
+        cursor = _cursor(b'{"k": "_id", "id": {"$oid": "zz"}}')
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(cursor)
+
+    def test_parse_page_params_raises_value_error(self):
+        cursor = _cursor(b'{"k": "_id", "id": {"$oid": "zz"}}')
+        with self.assertRaises(ValueError):
+            parse_page_params({"cursor": cursor})
+
+    def test_not_base64_is_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("!!!")
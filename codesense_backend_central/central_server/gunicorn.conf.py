@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+#
+#   gunicorn central_server.wsgi -c gunicorn.conf.py
+#
+# Works with or without --preload: MongoDBClient rebuilds its client in each
+# worker (PID check), and the hook below opens the worker's pool before it
+# accepts requests.
+
+
+def post_worker_init(worker):
+    from django.conf import settings
+    from common.db import MongoDBClient
+
+    if not getattr(settings, "MONGO_WARM_UP", True):
+        return
+    try:
+        opened = MongoDBClient.warm_up()
+        worker.log.info(f"MongoDB pool warmed up ({opened} connections)")
+    except ConnectionError as e:
+        # Serve anyway; requests connect on demand once Mongo is reachable
+        worker.log.warning(f"MongoDB warm-up failed: {e}")
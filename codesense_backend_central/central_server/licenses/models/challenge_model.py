@@ -0,0 +1,78 @@
+# licenses/models/challenge_model.py
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from common.db import MongoCollection
+from common.db.async_client import AsyncMongoDBClient
+from licenses.services.crypto import random_nonce
+
+
+class ChallengeModel:
+    """
+    Outstanding handshake challenges, one document per nonce. A local may
+    hold several at once; each is consumed exactly once and the TTL index
+    on `expires_at` removes the ones never answered.
+    """
+    collection = MongoCollection("challenges")
+
+    @staticmethod
+    def ttl_seconds():
+        return getattr(settings, "CHALLENGE_TTL_SECONDS", 60)
+
+    @classmethod
+    def async_collection(cls):
+        return AsyncMongoDBClient.get_database()["challenges"]
+
+    @classmethod
+    def _new_challenge(cls, local_id, license_id):
+        now = datetime.now(timezone.utc)
+        return {
+            "_id": random_nonce(),
+            "local_id": local_id,
+            "license_id": ObjectId(license_id),
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=cls.ttl_seconds()),
+        }
+
+    @staticmethod
+    def _consume_filter(nonce, local_id, license_id):
+        return {
+            "_id": nonce,
+            "local_id": local_id,
+            "license_id": ObjectId(license_id),
+            "expires_at": {"$gt": datetime.now(timezone.utc)},
+        }
+
+    @classmethod
+    def issue(cls, local_id, license_id):
+        """Store a fresh nonce bound to the local and return it."""
+        challenge = cls._new_challenge(local_id, license_id)
+        cls.collection.insert_one(challenge)
+        return challenge["_id"]
+
+    @classmethod
+    async def aissue(cls, local_id, license_id):
+        challenge = cls._new_challenge(local_id, license_id)
+        await cls.async_collection().insert_one(challenge)
+        return challenge["_id"]
+
+    @classmethod
+    def consume(cls, nonce, local_id, license_id):
+        """
+        Check and invalidate a nonce in one atomic round trip. Returns True
+        only for an unexpired nonce issued to this local. The explicit
+        `expires_at` filter covers the gap before the TTL monitor runs.
+        """
+        doc = cls.collection.find_one_and_delete(
+            cls._consume_filter(nonce, local_id, license_id),
+            projection={"_id": 1},
+        )
+        return doc is not None
+
+    @classmethod
+    async def aconsume(cls, nonce, local_id, license_id):
+        doc = await cls.async_collection().find_one_and_delete(
+            cls._consume_filter(nonce, local_id, license_id),
+            projection={"_id": 1},
+        )
+        return doc is not None
@@ -0,0 +1,186 @@
+# licenses/models/dashboard_summary_model.py
+from bson import ObjectId
+from datetime import datetime, timezone
+from pymongo import DESCENDING
+from common.db import MongoCollection, MongoDBClient
+from common.response_cache import invalidate_response_cache
+
+
+class DashboardSummaryModel:
+    """
+    Materialized view behind the dashboard: one pre-computed row per license
+    (`kind: "license"`, keyed by the license `_id`) plus a single global
+    totals row (`_id: "totals"`). Write paths keep it current incrementally;
+    `rebuild()` recomputes it from `licenses`/`locals`/`users`. Rows hold raw
+    counters only; percentages are derived on read (`usage_block`).
+    """
+    collection = MongoCollection("dashboard_summary")
+    COLLECTION_NAME = "dashboard_summary"
+    TOTALS_ID = "totals"
+
+    @staticmethod
+    def usage_block(used, limit):
+        return {
+            "used": used,
+            "limit": limit,
+            "percentage": round((used / limit) * 100, 2) if limit else 0,
+        }
+
+    @classmethod
+    def _rows_pipeline(cls, match=None):
+        """
+        Build summary rows from `licenses` in one server-side pass.
+        `days_left` is not stored since it changes daily; it is derived from
+        `expiry` on read.
+        """
+        pipeline = [{"$match": match}] if match else []
+        pipeline += [
+            {"$lookup": {
+                "from": "locals",
+                "localField": "_id",
+                "foreignField": "license_id",
+                "pipeline": [{"$project": {"_id": 1}}],
+                "as": "linked_locals",
+            }},
+            {"$project": {
+                "kind": "license",
+                "client": 1,
+                "status": 1,
+                "expiry": 1,
+                "scans": {"used": "$usage.scans", "limit": "$limits.scans"},
+                "users": {"used": "$usage.users", "limit": "$limits.users"},
+                "locals": {"total": {"$size": "$linked_locals"}},
+                "updated_at": "$$NOW",
+            }},
+        ]
+        return pipeline
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every row from scratch and reset the global totals. The
+        totals row gets `rebuilt_at`, which tells a complete summary apart
+        from a totals row that write paths upserted before any rebuild.
+        """
+        db = MongoDBClient.get_database()
+        pipeline = cls._rows_pipeline() + [{"$out": cls.COLLECTION_NAME}]
+        db.licenses.aggregate(pipeline)
+        cls.collection.update_one(
+            {"_id": cls.TOTALS_ID},
+            {"$set": {
+                "kind": "totals",
+                "licenses_total": db.licenses.count_documents({}),
+                "locals_total": db.locals.count_documents({}),
+                "users_total": db.users.count_documents({"deleted": False}),
+                "rebuilt_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc),
+            }},
+            upsert=True,
+        )
+
+    @classmethod
+    def refresh_licenses(cls, license_ids):
+        """Recompute the rows of the given licenses only."""
+        ids = [ObjectId(license_id) for license_id in license_ids]
+        if not ids:
+            return
+        pipeline = cls._rows_pipeline({"_id": {"$in": ids}}) + [{
+            "$merge": {
+                "into": cls.COLLECTION_NAME,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        }]
+        MongoDBClient.get_database().licenses.aggregate(pipeline)
+
+    @classmethod
+    def refresh_license(cls, license_id):
+        cls.refresh_licenses([license_id])
+
+    @classmethod
+    def add_license(cls, license_id):
+        cls.refresh_license(license_id)
+        cls._inc_totals(licenses_total=1)
+
+    @classmethod
+    def add_local(cls, license_id):
+        cls.collection.update_one(
+            {"_id": ObjectId(license_id)},
+            {"$inc": {"locals.total": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        )
+        cls._inc_totals(locals_total=1)
+
+    @classmethod
+    def remove_license(cls, license_id):
+        """
+        Take a deleted license out of the summary: drop its row and remove
+        it and the locals counted on that row from the totals.
+        """
+        row = cls.collection.find_one_and_delete({"_id": ObjectId(license_id)})
+        locals_total = (row or {}).get("locals", {}).get("total", 0)
+        cls._inc_totals(licenses_total=-1, locals_total=-locals_total)
+        invalidate_response_cache()
+
+    @classmethod
+    def record_usage(cls, license_id, usage):
+        """
+        Copy usage counters onto the row. Concurrent increments may report
+        back out of order, so `$max` keeps the highest count seen.
+        """
+        cls.collection.update_one(
+            {"_id": ObjectId(license_id)},
+            {
+                "$max": {"scans.used": usage["scans"], "users.used": usage["users"]},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            },
+        )
+
+    @classmethod
+    def adjust_users(cls, delta):
+        cls._inc_totals(users_total=delta)
+        # Users are not written through License/LocalModel but still show up
+        # in the dashboard's users total
+        invalidate_response_cache()
+
+    @classmethod
+    def _inc_totals(cls, **deltas):
+        cls.collection.update_one(
+            {"_id": cls.TOTALS_ID},
+            {
+                "$inc": deltas,
+                "$set": {"kind": "totals", "updated_at": datetime.now(timezone.utc)},
+            },
+            upsert=True,
+        )
+
+    @classmethod
+    def latest_update(cls):
+        """Newest `updated_at` across the summary rows, or None."""
+        doc = cls.collection.find_one(
+            {}, projection={"updated_at": 1}, sort=[("updated_at", DESCENDING)]
+        )
+        return doc.get("updated_at") if doc else None
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Return (license_rows, totals) from a single read of the collection.
+        A summary that was never rebuilt only has rows for licenses written
+        since deploy, so it is rebuilt first.
+        """
+        rows, totals = cls._read()
+        if totals is None or not totals.get("rebuilt_at"):
+            cls.rebuild()
+            rows, totals = cls._read()
+        return rows, totals
+
+    @classmethod
+    def _read(cls):
+        rows, totals = [], None
+        for doc in cls.collection.find({}).sort("_id"):
+            if doc.get("kind") == "totals":
+                totals = doc
+            else:
+                rows.append(doc)
+        return rows, totals
@@ -0,0 +1,212 @@
+# licenses/models/lease_model.py
+import logging
+import math
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from pymongo import ReturnDocument
+from common.db import MongoCollection
+from licenses.models.license_model import LicenseModel
+from licenses.models.local_model import LocalModel
+
+logger = logging.getLogger(__name__)
+
+# Attempts to reserve a block when other writers move usage in between
+MAX_RESERVE_ATTEMPTS = 3
+# Weight of the newest observation in a local's consumption rate
+RATE_SMOOTHING = 0.5
+
+
+class LeaseModel:
+    """
+    Quota leases: a block of `units` scans or users reserved for one local
+    until `expires_at`. The block is held in `leased.<field>` on the license,
+    so every other writer sees it as taken and `usage + leased` can never
+    pass `limits`. On release the units the local reports as used become
+    usage and the rest return to the pool. A lease that expires unreleased
+    is charged in full: its JWT let the local spend every unit offline, so
+    none of them may be leased out again.
+    """
+    collection = MongoCollection("leases")
+
+    @staticmethod
+    def _setting(name, default):
+        return getattr(settings, name, default)
+
+    @classmethod
+    def duration_seconds(cls):
+        return cls._setting("LEASE_DURATION_SECONDS", 300)
+
+    @staticmethod
+    def serialize(lease_doc):
+        if not lease_doc:
+            return None
+        return {
+            "id": lease_doc["_id"],
+            "license_id": lease_doc["license_id"],
+            "local_id": lease_doc["local_id"],
+            "field": lease_doc["field"],
+            "units": lease_doc["units"],
+            "used": lease_doc.get("used", 0),
+            "status": lease_doc["status"],
+            "expires_at": lease_doc["expires_at"],
+        }
+
+    @classmethod
+    def size_for(cls, local_doc, field):
+        """
+        Units to lease to a local: its smoothed consumption rate (units per
+        second) over one lease duration plus headroom, clamped to the
+        configured bounds. Locals without history get the initial size.
+        """
+        low = cls._setting("LEASE_MIN_UNITS", 1)
+        high = cls._setting("LEASE_MAX_UNITS", 1000)
+        rate = (local_doc or {}).get("lease_rates", {}).get(field)
+        if rate is None:
+            units = cls._setting("LEASE_INITIAL_UNITS", 10)
+        else:
+            units = math.ceil(rate * cls.duration_seconds() * cls._setting("LEASE_HEADROOM", 1.5))
+        return max(low, min(units, high))
+
+    @classmethod
+    def grant(cls, license_id, local_id, field):
+        """
+        Reserve a block for `local_id` and store the lease. Expired leases of
+        the license are reclaimed first so their units can be handed out.
+        Returns the lease document, or None when nothing is left to lease.
+        """
+        cls.reclaim_expired(license_id)
+        wanted = cls.size_for(LocalModel.get_by_local_id(local_id, fields={"lease_rates": 1}), field)
+
+        license_doc = None
+        for _ in range(MAX_RESERVE_ATTEMPTS):
+            current = LicenseModel.find_by_id(license_id)
+            if not current or current.get("status") != "active":
+                return None
+            units = min(wanted, LicenseModel.available(current, field))
+            if units <= 0:
+                return None
+            license_doc = LicenseModel.reserve_lease(license_id, field, units)
+            if license_doc:
+                break
+        if not license_doc:
+            return None
+
+        now = datetime.now(timezone.utc)
+        lease_doc = {
+            "_id": ObjectId(),
+            "license_id": ObjectId(license_id),
+            "local_id": local_id,
+            "field": field,
+            "units": units,
+            "used": 0,
+            "status": "active",
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=cls.duration_seconds()),
+        }
+        try:
+            cls.collection.insert_one(lease_doc)
+        except Exception:
+            # Give the block back rather than leaking it
+            LicenseModel.settle_lease(license_id, field, units, 0)
+            raise
+        return lease_doc
+
+    @classmethod
+    def report(cls, lease_id, local_id, used):
+        """Record how much of an active lease the local has consumed so far."""
+        return cls.collection.find_one_and_update(
+            {"_id": ObjectId(lease_id), "local_id": local_id, "status": "active", "units": {"$gte": used}},
+            {"$max": {"used": used}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @classmethod
+    def release(cls, lease_id, local_id, used):
+        """
+        Close an active lease with its final `used` count (capped at the
+        leased units) and settle it on the license. Returns the closed
+        lease, or None when it was not active, has expired (it is left to
+        `reclaim_expired` and charged in full) or is not held by this local.
+        """
+        lease_doc = cls.collection.find_one({"_id": ObjectId(lease_id), "local_id": local_id})
+        if not lease_doc:
+            return None
+        used = max(lease_doc.get("used", 0), min(used, lease_doc["units"]))
+        match = {"local_id": local_id, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+        return cls._close(lease_doc["_id"], match, used, "released")
+
+    @classmethod
+    def reclaim_expired(cls, license_id=None):
+        """
+        Settle every expired active lease, charging all of its units.
+        Returns the number of leases reclaimed.
+        """
+        query = {"status": "active", "expires_at": {"$lte": datetime.now(timezone.utc)}}
+        if license_id:
+            query["license_id"] = ObjectId(license_id)
+
+        reclaimed = 0
+        for lease_doc in cls.collection.find(query, projection={"_id": 1}):
+            if cls._close(lease_doc["_id"], {}, None, "expired"):
+                reclaimed += 1
+        return reclaimed
+
+    @classmethod
+    def reclaim_for(cls, license_doc):
+        """
+        Reclaim the expired leases of a license that has units out on
+        lease. Units on a dead lease count as taken until it is reclaimed,
+        so callers run this before refusing usage for lack of quota.
+        Returns True when something was reclaimed and the caller should
+        look at the license again.
+        """
+        if not license_doc or not any(license_doc.get("leased", {}).values()):
+            return False
+        return cls.reclaim_expired(license_doc["_id"]) > 0
+
+    @classmethod
+    def _close(cls, lease_id, match, used, status):
+        """
+        Flip a lease from active to `status` exactly once, then return its
+        unused units to the license and feed the local's consumption rate.
+        `used=None` charges the whole block (expiry).
+        """
+        update = {"status": status, "closed_at": datetime.now(timezone.utc)}
+        # Pipeline update so an expired lease can take `used` from its own `units`
+        update["used"] = "$units" if used is None else {"$literal": used}
+        lease_doc = cls.collection.find_one_and_update(
+            {"_id": lease_id, "status": "active", **match},
+            [{"$set": update}],
+            return_document=ReturnDocument.AFTER,
+        )
+        if not lease_doc:
+            return None
+
+        LicenseModel.settle_lease(
+            lease_doc["license_id"], lease_doc["field"], lease_doc["units"], lease_doc["used"],
+            local_id=lease_doc["local_id"],
+        )
+        if used is None:
+            return lease_doc  # no report behind the charge, nothing to learn from
+        try:
+            cls._observe_rate(lease_doc)
+        except Exception as e:
+            # Sizing falls back to the previous rate; the quota is already settled
+            logger.error(f"Failed to update lease rate for {lease_doc['local_id']}: {e}")
+        return lease_doc
+
+    @classmethod
+    def _observe_rate(cls, lease_doc):
+        """Blend this lease's units/second into the local's smoothed rate."""
+        elapsed = (lease_doc["closed_at"] - lease_doc["created_at"]).total_seconds()
+        elapsed = min(max(elapsed, 1), cls.duration_seconds())
+        observed = lease_doc["used"] / elapsed
+        key = f"lease_rates.{lease_doc['field']}"
+        LocalModel.collection.update_one(
+            {"local_id": lease_doc["local_id"]},
+            [{"$set": {key: {"$add": [
+                {"$multiply": [RATE_SMOOTHING, observed]},
+                {"$multiply": [1 - RATE_SMOOTHING, {"$ifNull": [f"${key}", observed]}]},
+            ]}}}],
+        )
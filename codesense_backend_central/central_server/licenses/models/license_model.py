@@ -1,32 +1,51 @@
 # licenses/models.py
+import logging
 from bson import ObjectId
 from datetime import datetime, timezone
-from common.db import MongoDBClient
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from asgiref.sync import sync_to_async
+from common.db import MongoCollection
+from common.db.async_client import AsyncMongoDBClient
+from common.db.pagination import keyset_page, offset_page
+from common.response_cache import invalidate_response_cache
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
+from licenses.models.usage_event_model import UsageEventModel
+from licenses.services.license_config import invalidate_license_config
+
+logger = logging.getLogger(__name__)
 
 class LicenseModel:
-    collection = MongoDBClient.get_database()["licenses"]
+    collection = MongoCollection("licenses")
+    SORT_FIELDS = ("_id", "created_at", "updated_at", "expiry")
+    # usage_type sent by locals -> counter under `usage`/`limits`
+    USAGE_FIELDS = {"scan": "scans", "user": "users"}
+    # Projection for limit checks: everything `available()` and a status check read
+    QUOTA_FIELDS = {"status": 1, "limits": 1, "usage": 1, "leased": 1}
 
     @staticmethod
     def serialize(doc):
         if not doc:
             return None
         return {
-            "id": str(doc.get("_id")),
+            "id": doc.get("_id"),
             "client": {
                 "name": doc.get("client", {}).get("name"),
                 "contact_email": doc.get("client", {}).get("contact_email"),
             },
             "limits": doc.get("limits", {}),
             "usage": doc.get("usage", {}),
-            "expiry": doc["expiry"].isoformat() if isinstance(doc.get("expiry"), datetime) else doc.get("expiry"),
+            "expiry": doc.get("expiry"),
             "status": doc.get("status"),
-            "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None,
-            "updated_at": doc["updated_at"].isoformat() if doc.get("updated_at") else None,
+            "created_at": doc.get("created_at"),
+            "updated_at": doc.get("updated_at"),
         }
 
     @classmethod
-    def create(cls, client_name, contact_email, limits, expiry):
-        data = {
+    def build_document(cls, client_name, contact_email, limits, expiry):
+        """New license document, ready to insert."""
+        now = datetime.now(timezone.utc)
+        return {
             "client": {
                 "name": client_name,
                 "contact_email": contact_email,
@@ -38,27 +57,178 @@ class LicenseModel:
             },
             "expiry": expiry,
             "status": "active",
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
+            "created_at": now,
+            "updated_at": now,
         }
+
+    @classmethod
+    def create(cls, client_name, contact_email, limits, expiry):
+        data = cls.build_document(client_name, contact_email, limits, expiry)
         result = cls.collection.insert_one(data)
+        DashboardSummaryModel.add_license(result.inserted_id)
+        invalidate_response_cache()
         return cls.serialize(cls.find_by_id(result.inserted_id))
 
     @classmethod
-    def find_by_id(cls, id):
-        return cls.collection.find_one({"_id": ObjectId(id)})
+    def insert_many(cls, docs):
+        """
+        Insert built documents in one unordered batch: a failing document
+        does not stop the others. Returns (inserted_ids, {index: error}).
+        The caller invalidates the response cache once it is done.
+        """
+        failures = {}
+        try:
+            cls.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failures = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+        inserted_ids = [doc["_id"] for index, doc in enumerate(docs) if index not in failures]
+
+        if inserted_ids:
+            DashboardSummaryModel.refresh_licenses(inserted_ids)
+            DashboardSummaryModel._inc_totals(licenses_total=len(inserted_ids))
+        return inserted_ids, failures
+
+    @classmethod
+    def find_by_id(cls, id, fields=None):
+        """The license, or only `fields` (a projection, e.g. QUOTA_FIELDS) of it."""
+        return cls.collection.find_one({"_id": ObjectId(id)}, projection=fields)
+
+    @classmethod
+    def async_collection(cls):
+        return AsyncMongoDBClient.get_database()["licenses"]
+
+    @classmethod
+    async def afind_by_id(cls, id, fields=None):
+        return await cls.async_collection().find_one({"_id": ObjectId(id)}, projection=fields)
 
     @classmethod
     def update(cls, license_id, data):
+        data = {**data, "updated_at": datetime.now(timezone.utc)}
         cls.collection.update_one({"_id": ObjectId(license_id)}, {"$set": data})
+        DashboardSummaryModel.refresh_license(license_id)
+        invalidate_response_cache()
+        invalidate_license_config(license_id)
         return cls.serialize(cls.find_by_id(license_id))
     
     @classmethod
     def update_status(cls, license_id, status):
-        return cls.collection.update_one(
+        result = cls.collection.update_one(
             {"_id": ObjectId(license_id)},
             {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}}
         )
+        if result.modified_count:
+            DashboardSummaryModel.refresh_license(license_id)
+            invalidate_response_cache()
+            invalidate_license_config(license_id)
+        return result
+
+    @staticmethod
+    def _fits_expr(field, amount):
+        """$expr guard: usage + leased + amount <= limit for one counter."""
+        return {"$lte": [
+            {"$add": [
+                {"$ifNull": [f"$usage.{field}", 0]},
+                {"$ifNull": [f"$leased.{field}", 0]},
+                amount,
+            ]},
+            f"$limits.{field}",
+        ]}
+
+    @staticmethod
+    def available(license_doc, field):
+        """Units of `field` still free: limit - usage - units reserved by leases."""
+        return (
+            license_doc["limits"][field]
+            - license_doc.get("usage", {}).get(field, 0)
+            - license_doc.get("leased", {}).get(field, 0)
+        )
+
+    @classmethod
+    def _usage_applied(cls, doc, increments, local_id=None, source=None):
+        DashboardSummaryModel.record_usage(doc["_id"], doc["usage"])
+        invalidate_response_cache()
+        try:
+            UsageEventModel.record(doc["_id"], increments, local_id=local_id, source=source)
+        except Exception as e:
+            # The counter is authoritative; a missed ledger entry must not fail the request
+            logger.error(f"Failed to record usage event for {doc['_id']}: {e}")
+
+    @classmethod
+    def increment_usage(cls, license_id, increments, local_id=None, source=None):
+        """
+        Atomically add `increments` (e.g. {"scans": 1}) to an active license's
+        usage, but only if every counter stays within its limit (minus units
+        reserved by leases). The limit check runs inside the filter, so
+        concurrent callers can neither lose increments nor overshoot.
+        Applied increments are also recorded in the usage ledger. Returns the
+        updated document (usage and limits) or None when nothing matched.
+        """
+        guards = [cls._fits_expr(field, amount) for field, amount in increments.items()]
+        doc = cls.collection.find_one_and_update(
+            {"_id": ObjectId(license_id), "status": "active", "$expr": {"$and": guards}},
+            {"$inc": {f"usage.{field}": amount for field, amount in increments.items()}},
+            projection=cls.QUOTA_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc:
+            cls._usage_applied(doc, increments, local_id=local_id, source=source)
+        return doc
+
+    @classmethod
+    async def aincrement_usage(cls, license_id, increments, local_id=None, source=None):
+        """Async form of increment_usage for the ASGI handshake views."""
+        guards = [cls._fits_expr(field, amount) for field, amount in increments.items()]
+        doc = await cls.async_collection().find_one_and_update(
+            {"_id": ObjectId(license_id), "status": "active", "$expr": {"$and": guards}},
+            {"$inc": {f"usage.{field}": amount for field, amount in increments.items()}},
+            projection=cls.QUOTA_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc:
+            # Summary, cache and ledger bookkeeping stays on the sync path,
+            # run off the event loop
+            await sync_to_async(cls._usage_applied, thread_sensitive=False)(
+                doc, increments, local_id=local_id, source=source
+            )
+        return doc
+
+    @classmethod
+    def reserve_lease(cls, license_id, field, units):
+        """
+        Atomically set aside `units` of `field` for a lease, only if they fit
+        in limit - usage - leased. Returns the updated document or None.
+        """
+        return cls.collection.find_one_and_update(
+            {"_id": ObjectId(license_id), "status": "active", "$expr": cls._fits_expr(field, units)},
+            {"$inc": {f"leased.{field}": units}},
+            projection=cls.QUOTA_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @classmethod
+    def settle_lease(cls, license_id, field, units, used, local_id=None):
+        """
+        Close a lease of `units`: the `used` part becomes real usage and the
+        rest goes back to the pool. Not limit-guarded, the units were
+        reserved when the lease was granted.
+        """
+        doc = cls.collection.find_one_and_update(
+            {"_id": ObjectId(license_id)},
+            {"$inc": {f"leased.{field}": -units, f"usage.{field}": used}},
+            projection=cls.QUOTA_FIELDS,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc and used:
+            cls._usage_applied(doc, {field: used}, local_id=local_id, source="lease")
+        return doc
+
+    @classmethod
+    def latest_update(cls):
+        """Newest `updated_at` across all licenses, or None."""
+        doc = cls.collection.find_one(
+            {}, projection={"updated_at": 1}, sort=[("updated_at", DESCENDING)]
+        )
+        return doc.get("updated_at") if doc else None
 
     # @classmethod
     # def increment_scan(cls, license_id):
@@ -68,20 +238,19 @@ class LicenseModel:
     #     )
 
     @classmethod
-    def list_all(cls, page=1, limit=10):
+    def list_all(cls, page=1, limit=10, cursor=None, sort="_id", total="exact"):
+        """
+        Page through licenses. Passing `cursor` ("" for the first page)
+        switches from skip/limit to keyset pagination on (sort, _id).
+        """
         try:
-            skip = (page - 1) * limit
-            cursor = cls.collection.find().skip(skip).limit(limit)
-            licenses = [cls.serialize(doc) for doc in cursor]
-            total = cls.collection.count_documents({})
+            if cursor is not None:
+                docs, pagination = keyset_page(cls.collection, {}, cursor, limit, sort, total)
+            else:
+                docs, pagination = offset_page(cls.collection, {}, page, limit, total)
             return {
-                "licenses": licenses,
-                "pagination": {
-                    "total": total,
-                    "page": page,
-                    "limit": limit,
-                    "pages": (total + limit - 1) // limit
-                }
+                "licenses": [cls.serialize(doc) for doc in docs],
+                "pagination": pagination,
             }
         except Exception as e:
             return {"error": f"Internal Server Error: {str(e)}"}
@@ -1,24 +1,33 @@
 # licenses/models.py
 from bson import ObjectId
 from datetime import datetime, timezone
-from common.db import MongoDBClient
+from pymongo import ReturnDocument
+from common.db import MongoCollection
+from common.db.async_client import AsyncMongoDBClient
+from common.db.pagination import keyset_page, offset_page
+from common.response_cache import invalidate_response_cache
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
+from licenses.services.crypto import invalidate_local_public_key
 
 class LocalModel:
-    collection = MongoDBClient.get_database()["locals"]
+    collection = MongoCollection("locals")
+    SORT_FIELDS = ("_id", "created_at", "updated_at")
+    # What a handshake reads; served from the local_id_handshake index alone
+    HANDSHAKE_FIELDS = {"_id": 0, "license_id": 1, "public_key": 1, "status": 1}
 
     @staticmethod
     def serialize(local_doc):
         if not local_doc:
             return None
         return {
-            "id": str(local_doc.get("_id")),
-            "license_id": str(local_doc.get("license_id")),
+            "id": local_doc.get("_id"),
+            "license_id": local_doc.get("license_id"),
             "local_id": local_doc.get("local_id"),  # unique UUID per local
             "public_key": local_doc.get("public_key"),  # PEM or fingerprint
             "machine_uuid": local_doc.get("machine_uuid"),  # optional system identifier
             "status": local_doc.get("status"),  # active | blocked | revoked
-            "created_at": local_doc["created_at"].isoformat() if local_doc.get("created_at") else None,
-            "updated_at": local_doc["updated_at"].isoformat() if local_doc.get("updated_at") else None,
+            "created_at": local_doc.get("created_at"),
+            "updated_at": local_doc.get("updated_at"),
         }
 
     @classmethod
@@ -29,11 +38,12 @@ class LocalModel:
             "public_key": public_key,  # store PEM or base64 fingerprint
             "machine_uuid": machine_uuid,  # optional system-level identifier
             "status": "active",
-            "nonce": None,
             "created_at": datetime.now(timezone.utc),
             "updated_at": datetime.now(timezone.utc),
         }
         result = cls.collection.insert_one(data)
+        DashboardSummaryModel.add_local(license_id)
+        invalidate_response_cache()
         return cls.serialize(cls.find_by_id(result.inserted_id))
 
     @classmethod
@@ -41,8 +51,17 @@ class LocalModel:
         return cls.collection.find_one({"_id": ObjectId(local_id)})
 
     @classmethod
-    def get_by_local_id(cls, local_id):
-        return cls.collection.find_one({"local_id": local_id})
+    def get_by_local_id(cls, local_id, fields=None):
+        """The local, or only `fields` (a projection, e.g. HANDSHAKE_FIELDS) of it."""
+        return cls.collection.find_one({"local_id": local_id}, projection=fields)
+
+    @classmethod
+    def async_collection(cls):
+        return AsyncMongoDBClient.get_database()["locals"]
+
+    @classmethod
+    async def aget_by_local_id(cls, local_id, fields=None):
+        return await cls.async_collection().find_one({"local_id": local_id}, projection=fields)
 
     @classmethod
     def get_by_license(cls, license_id):
@@ -50,10 +69,17 @@ class LocalModel:
 
     @classmethod
     def update_status(cls, local_id, status):
-        return cls.collection.update_one(
+        doc = cls.collection.find_one_and_update(
             {"_id": ObjectId(local_id)},
             {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
+            projection={"license_id": 1, "local_id": 1, "status": 1},
+            return_document=ReturnDocument.AFTER,
         )
+        if doc:
+            invalidate_local_public_key(doc["local_id"])
+            DashboardSummaryModel.refresh_license(doc["license_id"])
+            invalidate_response_cache()
+        return doc
 
     @classmethod
     def block(cls, local_id):
@@ -64,20 +90,19 @@ class LocalModel:
         return cls.update_status(local_id, "revoked")
 
     @classmethod
-    def list_all(cls, page=1, limit=10):
+    def list_all(cls, page=1, limit=10, cursor=None, sort="_id", total="exact"):
+        """
+        Page through locals. Passing `cursor` ("" for the first page)
+        switches from skip/limit to keyset pagination on (sort, _id).
+        """
         try:
-            skip = (page - 1) * limit
-            cursor = cls.collection.find().skip(skip).limit(limit)
-            locals_ = [cls.serialize(doc) for doc in cursor]
-            total = cls.collection.count_documents({})
+            if cursor is not None:
+                docs, pagination = keyset_page(cls.collection, {}, cursor, limit, sort, total)
+            else:
+                docs, pagination = offset_page(cls.collection, {}, page, limit, total)
             return {
-                "locals": locals_,
-                "pagination": {
-                    "total": total,
-                    "page": page,
-                    "limit": limit,
-                    "pages": (total + limit - 1) // limit,
-                },
+                "locals": [cls.serialize(doc) for doc in docs],
+                "pagination": pagination,
             }
         except Exception as e:
             return {"error": f"Internal Server Error: {str(e)}"}
@@ -0,0 +1,78 @@
+# licenses/models/usage_event_model.py
+from bson import ObjectId
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from common.db import MongoCollection
+
+
+class UsageEventModel:
+    """
+    Append-only ledger of usage increments (`usage_events`, TTL-bounded)
+    plus pre-aggregated hourly/daily buckets (`usage_rollups`) so history
+    queries read O(buckets) documents instead of O(events).
+    """
+    events = MongoCollection("usage_events")
+    rollups = MongoCollection("usage_rollups")
+    GRANULARITIES = ("hour", "day")
+
+    @staticmethod
+    def bucket_start(ts, granularity):
+        """Start of the UTC hour/day holding `ts` (naive values are taken as UTC)."""
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        ts = ts.replace(minute=0, second=0, microsecond=0)
+        if granularity == "day":
+            ts = ts.replace(hour=0)
+        return ts
+
+    @classmethod
+    def record(cls, license_id, increments, local_id=None, source=None):
+        """Append one ledger entry and `$inc` its hour and day buckets."""
+        license_id = ObjectId(license_id)
+        now = datetime.now(timezone.utc)
+        cls.events.insert_one({
+            "license_id": license_id,
+            "local_id": local_id,
+            "counts": increments,
+            "source": source,
+            "ts": now,
+        })
+        cls.rollups.bulk_write([
+            UpdateOne(
+                {
+                    "license_id": license_id,
+                    "granularity": granularity,
+                    "bucket": cls.bucket_start(now, granularity),
+                },
+                {"$inc": {f"counts.{field}": amount for field, amount in increments.items()}},
+                upsert=True,
+            )
+            for granularity in cls.GRANULARITIES
+        ], ordered=False)
+
+    @classmethod
+    def remove_license(cls, license_id):
+        """Delete a license's ledger entries and rollup buckets."""
+        license_id = ObjectId(license_id)
+        cls.events.delete_many({"license_id": license_id})
+        cls.rollups.delete_many({"license_id": license_id})
+
+    @classmethod
+    def series(cls, license_id, granularity, start, end):
+        """Usage per bucket in [start, end), oldest first. Empty buckets are omitted."""
+        cursor = cls.rollups.find(
+            {
+                "license_id": ObjectId(license_id),
+                "granularity": granularity,
+                "bucket": {"$gte": cls.bucket_start(start, granularity), "$lt": end},
+            },
+            projection={"_id": 0, "bucket": 1, "counts": 1},
+        ).sort("bucket", 1)
+        return [
+            {
+                "bucket": doc["bucket"].replace(tzinfo=timezone.utc),
+                "scans": doc.get("counts", {}).get("scans", 0),
+                "users": doc.get("counts", {}).get("users", 0),
+            }
+            for doc in cursor
+        ]
@@ -0,0 +1,75 @@
+# licenses/models/usage_idempotency_model.py
+from bson import ObjectId
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from common.db import MongoCollection
+
+DUPLICATE_KEY = 11000
+
+
+class UsageIdempotencyModel:
+    """
+    Idempotency keys of batched usage events. A key is claimed by inserting
+    it (unique `_id`), so replays are detected atomically; the stored
+    outcome lets a replay get the original answer. Documents expire through
+    a TTL index on `created_at` (see common.db.indexes).
+    """
+    collection = MongoCollection("usage_idempotency")
+
+    @staticmethod
+    def _id(license_id, key):
+        return f"{license_id}:{key}"
+
+    @classmethod
+    def claim(cls, license_id, events):
+        """
+        Claim the idempotency keys of `events` in one `insert_many`.
+        Returns {key: stored_doc} for keys that were already claimed.
+        """
+        now = datetime.now(timezone.utc)
+        docs = [
+            {
+                "_id": cls._id(license_id, event["idempotency_key"]),
+                "license_id": ObjectId(license_id),
+                "key": event["idempotency_key"],
+                "type": event["type"],
+                "count": event["count"],
+                "status": "pending",
+                "created_at": now,
+            }
+            for event in events
+        ]
+        if not docs:
+            return {}
+
+        try:
+            cls.collection.insert_many(docs, ordered=False)
+            return {}
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error["code"] != DUPLICATE_KEY for error in errors):
+                raise
+            duplicate_ids = [docs[error["index"]]["_id"] for error in errors]
+
+        return {doc["key"]: doc for doc in cls.collection.find({"_id": {"$in": duplicate_ids}})}
+
+    @classmethod
+    def record_outcomes(cls, license_id, outcomes):
+        """Persist per-event outcomes ({key: {"status": ..., "error": ...}}) in one bulk_write."""
+        if not outcomes:
+            return
+        cls.collection.bulk_write([
+            UpdateOne({"_id": cls._id(license_id, key)}, {"$set": outcome})
+            for key, outcome in outcomes.items()
+        ], ordered=False)
+
+    @classmethod
+    def release(cls, license_id, keys):
+        """Drop claims whose events could not be applied, so they can be retried."""
+        cls.collection.delete_many({"_id": {"$in": [cls._id(license_id, key) for key in keys]}})
+
+    @classmethod
+    def remove_license(cls, license_id):
+        """Delete every claim of a license."""
+        cls.collection.delete_many({"license_id": ObjectId(license_id)})
@@ -1,5 +1,5 @@
 # license/serializers/license_serializers.py
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from rest_framework import serializers
 
 
@@ -72,3 +72,23 @@ class LicenseUpdateSerializer(serializers.Serializer):
             "expiry": validated["expiry"],
             "status": validated["status"]
         }
+
+class UsageSeriesQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=["hour", "day"], required=False, default="day")
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    # Longest range per granularity, keeps responses to a bounded number of buckets
+    MAX_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+    DEFAULT_RANGE = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+    def validate(self, attrs):
+        granularity = attrs["granularity"]
+        end = attrs.get("end") or datetime.now(timezone.utc)
+        start = attrs.get("start") or end - self.DEFAULT_RANGE[granularity]
+        if start >= end:
+            raise serializers.ValidationError("start must be before end")
+        if end - start > self.MAX_RANGE[granularity]:
+            raise serializers.ValidationError(f"Range too large for {granularity} granularity")
+        attrs["start"], attrs["end"] = start, end
+        return attrs
@@ -1,6 +1,28 @@
+from django.conf import settings
 from rest_framework import serializers
 
 class LocalProvisionSerializer(serializers.Serializer):
     license_id = serializers.CharField(required=True)
     local_pubkey = serializers.CharField(required=True)
     machine_uuid = serializers.CharField(required=False, allow_blank=True)
+
+
+class UsageEventSerializer(serializers.Serializer):
+    idempotency_key = serializers.CharField(required=True, max_length=128)
+    type = serializers.ChoiceField(choices=["scan", "user"], required=True)
+    count = serializers.IntegerField(required=False, min_value=1, default=1)
+
+
+class UsageBatchSerializer(serializers.Serializer):
+    license_id = serializers.CharField(required=True)
+    local_id = serializers.CharField(required=False)
+    events = UsageEventSerializer(many=True, allow_empty=False)
+
+    def validate_events(self, value):
+        max_events = getattr(settings, "USAGE_BATCH_MAX_EVENTS", 500)
+        if len(value) > max_events:
+            raise serializers.ValidationError(f"At most {max_events} events per batch")
+        keys = [event["idempotency_key"] for event in value]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError("Duplicate idempotency_key in batch")
+        return value
@@ -0,0 +1,135 @@
+# licenses/services/challenges.py
+"""
+Handshake challenges, in one of two modes selected by CHALLENGE_MODE:
+
+- "db" (default): nonces live in the `challenges` collection and are
+  consumed atomically (ChallengeModel).
+- "stateless": the nonce is a short-lived HMAC-signed token bound to the
+  local and license. Issuing it needs no database I/O; replays are refused
+  by an in-memory seen-set that only has to cover the token lifetime.
+  That set is per process, so with several workers a token could be
+  answered once per worker within its TTL; keep the TTL short, or use
+  "db" mode where strict single use matters.
+"""
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from licenses.models.challenge_model import ChallengeModel
+from licenses.services.crypto import random_nonce
+
+
+def challenge_mode() -> str:
+    return getattr(settings, "CHALLENGE_MODE", "db")
+
+
+def challenge_ttl() -> int:
+    return ChallengeModel.ttl_seconds()
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _mac(body: str) -> str:
+    secret = getattr(settings, "CHALLENGE_TOKEN_SECRET", None) or settings.SECRET_KEY
+    return _b64(hmac.new(secret.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def issue_challenge_token(local_id: str, license_id: str, ttl_seconds: int) -> str:
+    """Signed token `<body>.<mac>`; body = [local_id, license_id, exp, token_id]."""
+    exp = int(time.time()) + ttl_seconds
+    body = _b64(json.dumps([local_id, license_id, exp, random_nonce(16)], separators=(",", ":")).encode())
+    return f"{body}.{_mac(body)}"
+
+
+def verify_challenge_token(token: str, local_id: str, license_id: str):
+    """Return (token_id, exp) for a valid, unexpired token bound to this local, else None."""
+    body, _, mac = token.partition(".")
+    # Compare bytes: compare_digest refuses non-ASCII str with TypeError
+    if not body or not hmac.compare_digest(mac.encode(), _mac(body).encode()):
+        return None
+    try:
+        token_local_id, token_license_id, exp, token_id = json.loads(_unb64(body))
+    except (ValueError, TypeError):
+        return None
+    if token_local_id != local_id or token_license_id != license_id or exp <= time.time():
+        return None
+    return token_id, exp
+
+
+class ReplayGuard:
+    """
+    Bounded set of token ids already answered, each kept only until its
+    token expires. When full, the entries closest to expiry are evicted and
+    the guard refuses any token expiring at or before them (fail closed), so
+    eviction can never re-open a replay window.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._seen = {}
+        self._expiries = []  # heap of (exp, token_id)
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        while self._expiries and self._expiries[0][0] <= now:
+            _, token_id = heapq.heappop(self._expiries)
+            self._seen.pop(token_id, None)
+
+    def first_use(self, token_id: str, exp: int) -> bool:
+        """Record `token_id`; False if it was seen before or cannot be tracked."""
+        with self._lock:
+            self._purge(time.time())
+            if token_id in self._seen or exp <= self._floor:
+                return False
+            while len(self._seen) >= self.maxsize:
+                evicted_exp, evicted_id = heapq.heappop(self._expiries)
+                self._seen.pop(evicted_id, None)
+                self._floor = max(self._floor, evicted_exp)
+            if exp <= self._floor:
+                return False
+            self._seen[token_id] = exp
+            heapq.heappush(self._expiries, (exp, token_id))
+            return True
+
+
+_replay_guard = ReplayGuard(getattr(settings, "CHALLENGE_REPLAY_CACHE_SIZE", 100000))
+
+
+def issue_challenge(local_id: str, license_id: str) -> str:
+    if challenge_mode() == "stateless":
+        return issue_challenge_token(local_id, license_id, challenge_ttl())
+    return ChallengeModel.issue(local_id, license_id)
+
+
+def consume_challenge(nonce: str, local_id: str, license_id: str) -> bool:
+    """True exactly once for a valid challenge issued to this local."""
+    if challenge_mode() == "stateless":
+        verified = verify_challenge_token(nonce, local_id, license_id)
+        return verified is not None and _replay_guard.first_use(*verified)
+    return ChallengeModel.consume(nonce, local_id, license_id)
+
+
+async def aissue_challenge(local_id: str, license_id: str) -> str:
+    if challenge_mode() == "stateless":
+        return issue_challenge_token(local_id, license_id, challenge_ttl())
+    return await ChallengeModel.aissue(local_id, license_id)
+
+
+async def aconsume_challenge(nonce: str, local_id: str, license_id: str) -> bool:
+    if challenge_mode() == "stateless":
+        verified = verify_challenge_token(nonce, local_id, license_id)
+        return verified is not None and _replay_guard.first_use(*verified)
+    return await ChallengeModel.aconsume(nonce, local_id, license_id)
@@ -0,0 +1,95 @@
+# licenses/services/config_export.py
+"""
+Bulk export of signed license configs as a ZIP stream.
+
+Licenses are read through a batched cursor and signed one chunk at a time
+on a small thread pool; each chunk is compressed and handed to the response
+before the next is read. Memory therefore stays at one chunk plus the
+ZIP central directory (one small record per file), whatever the number of
+licenses.
+"""
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+
+from common.serialization import dumps
+from licenses.models.license_model import LicenseModel
+from licenses.services.license_config import generate_license_config
+
+STATUSES = ("active", "expired", "revoked")
+
+
+def export_query(status=None, client=None, ids=None) -> dict:
+    """Mongo filter for the export. Raises ValueError on bad input."""
+    query = {}
+    if status:
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+        query["status"] = status
+    if client:
+        query["client.name"] = {"$regex": re.escape(client), "$options": "i"}
+    if ids:
+        try:
+            query["_id"] = {"$in": [ObjectId(license_id) for license_id in ids]}
+        except (InvalidId, TypeError):
+            raise ValueError("ids must be license ids")
+    return query
+
+
+class _ZipBuffer:
+    """Write-only sink for ZipFile; `drain()` hands over what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _signed_config(doc):
+    config = generate_license_config(LicenseModel.serialize(doc))
+    return f"license_{doc['_id']}.json", dumps(config, indent=True)
+
+
+def _chunks(cursor, size):
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_config_zip(query: dict):
+    """Yield the bytes of a ZIP holding one `license_<id>.json` per matching license."""
+    batch_size = getattr(settings, "LICENSE_EXPORT_BATCH_SIZE", 200)
+    workers = getattr(settings, "LICENSE_EXPORT_WORKERS", 4)
+
+    buffer = _ZipBuffer()
+    cursor = LicenseModel.collection.find(query).sort("_id").batch_size(batch_size)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="config-export") as pool:
+            # The buffer is not seekable, so ZipFile writes streaming-style entries
+            with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for chunk in _chunks(cursor, batch_size):
+                    for name, data in pool.map(_signed_config, chunk):
+                        archive.writestr(name, data)
+                    yield buffer.drain()
+        yield buffer.drain()  # central directory
+    finally:
+        cursor.close()
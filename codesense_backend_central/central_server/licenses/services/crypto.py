@@ -1,6 +1,10 @@
 # license/services/crypto.py
 import os
 import base64
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Tuple, Dict, Any
 from datetime import datetime, timedelta, timezone
@@ -11,6 +15,8 @@ from cryptography.hazmat.primitives import serialization
 import jwt  # pyjwt
 from django.conf import settings
 
+from common.lru import LRUCache
+
 # Config: override via environment if desired
 CENTRAL_KEYS_DIR = Path(getattr(settings, "CENTRAL_KEYS_DIR"))
 
@@ -44,6 +50,8 @@ def generate_root_keypair(path: Path | None = None) -> None:
     os.chmod(path / "central_root_sk.pem", 0o600)
     os.chmod(path / "central_root_pk.pem", 0o644)
 
+    rotate_root_keys()
+
 
 def load_root_keys(path: Path | None = None) -> Tuple[bytes, bytes]:
     """Return tuple (sk_pem_bytes, pk_pem_bytes)."""
@@ -53,11 +61,130 @@ def load_root_keys(path: Path | None = None) -> Tuple[bytes, bytes]:
     return sk, pk
 
 
+# --- Parsed root key cache ---
+
+@dataclass(frozen=True)
+class RootKeys:
+    private_key: Ed25519PrivateKey
+    public_key: Ed25519PublicKey
+    public_pem: bytes
+    fingerprint: str  # sha256 of the raw public key, hex
+
+
+class RootKeyHolder:
+    """
+    Keeps the parsed root keys in memory. The PEM files are only re-read
+    when their mtime changes (checked at most every `check_interval`
+    seconds) or after an explicit `rotate()`.
+    """
+
+    def __init__(self, path: Path | None = None, check_interval: float | None = None):
+        self._path = path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._keys: RootKeys | None = None
+        self._mtimes = None
+        self._checked_at = 0.0
+
+    @property
+    def path(self) -> Path:
+        return self._path or CENTRAL_KEYS_DIR
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return getattr(settings, "ROOT_KEYS_CHECK_INTERVAL", 5)
+
+    def _stat(self):
+        return tuple(
+            (self.path / name).stat().st_mtime_ns
+            for name in ("central_root_sk.pem", "central_root_pk.pem")
+        )
+
+    def _load(self) -> RootKeys:
+        sk_pem, pk_pem = load_root_keys(self.path)
+        private_key = serialization.load_pem_private_key(sk_pem, password=None)
+        if not isinstance(private_key, Ed25519PrivateKey):
+            raise ValueError("Central root key is not an Ed25519 key")
+        public_key = serialization.load_pem_public_key(pk_pem)
+        raw = public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw,
+        )
+        return RootKeys(
+            private_key=private_key,
+            public_key=public_key,
+            public_pem=pk_pem,
+            fingerprint=hashlib.sha256(raw).hexdigest(),
+        )
+
+    def get(self) -> RootKeys:
+        keys = self._keys
+        if keys is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return keys
+
+        with self._lock:
+            mtimes = self._stat()
+            if self._keys is None or mtimes != self._mtimes:
+                self._keys = self._load()
+                self._mtimes = mtimes
+            self._checked_at = time.monotonic()
+            return self._keys
+
+    def rotate(self) -> None:
+        """Forget the cached keys; the next `get()` reloads them from disk."""
+        with self._lock:
+            self._keys = None
+            self._mtimes = None
+
+
+_root_keys = RootKeyHolder()
+
+
+def get_root_keys() -> RootKeys:
+    """Parsed central root keys, served from memory on the hot path."""
+    return _root_keys.get()
+
+
+def rotate_root_keys() -> None:
+    # Cached signed license configs are keyed by the key fingerprint, so
+    # they are re-signed with the new key on their next download
+    _root_keys.rotate()
+
+
+# --- Parsed local public key cache ---
+
+_local_public_keys = LRUCache(maxsize=getattr(settings, "LOCAL_KEY_CACHE_SIZE", 10000))
+
+
+def load_local_public_key(local_id: str, public_key_pem: str) -> Ed25519PublicKey:
+    """
+    Return the parsed Ed25519 public key of a local. Keys are cached per
+    `local_id` together with the PEM fingerprint, so a re-provisioned key
+    is never served stale.
+    """
+    fingerprint = hashlib.sha256(public_key_pem.encode()).hexdigest()
+    cached = _local_public_keys.get(local_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    public_key = serialization.load_pem_public_key(public_key_pem.encode())
+    if not isinstance(public_key, Ed25519PublicKey):
+        raise ValueError("Local public key is not an Ed25519 key")
+    _local_public_keys.set(local_id, (fingerprint, public_key))
+    return public_key
+
+
+def invalidate_local_public_key(local_id: str) -> None:
+    _local_public_keys.pop(local_id)
+
+
 # --- JWT helpers (EdDSA / Ed25519) ---
 
-def sign_jwt(payload: Dict[str, Any], sk_pem: bytes, ttl_seconds: int | None = None) -> str:
+def sign_jwt(payload: Dict[str, Any], sk: Ed25519PrivateKey | bytes, ttl_seconds: int | None = None) -> str:
     """
-    Sign a JWT using Ed25519 private key bytes (PEM).
+    Sign a JWT using an Ed25519 private key (parsed key object or PEM bytes).
     Optionally adds `iat` and `exp` if ttl_seconds is provided.
     Returns compact JWT (string).
     """
@@ -67,29 +194,43 @@ def sign_jwt(payload: Dict[str, Any], sk_pem: bytes, ttl_seconds: int | None = N
     if ttl_seconds:
         claims["exp"] = int((now + timedelta(seconds=ttl_seconds)).timestamp())
 
-    return jwt.encode(claims, sk_pem, algorithm="EdDSA")
+    return jwt.encode(claims, sk, algorithm="EdDSA")
 
 
-def verify_jwt(token: str, pk_pem: bytes) -> Dict[str, Any]:
+def verify_jwt(token: str, pk: Ed25519PublicKey | bytes) -> Dict[str, Any]:
     """
-    Verify a JWT signed with Ed25519 public key bytes (PEM).
+    Verify a JWT signed with an Ed25519 public key (parsed key object or PEM bytes).
     Returns payload dict or raises jwt exceptions.
     """
-    return jwt.decode(token, pk_pem, algorithms=["EdDSA"])
+    return jwt.decode(token, pk, algorithms=["EdDSA"])
 
 
 # --- Specialized helpers ---
 
-def issue_provisioning_jwt(local_id: str, license_id: str, sk_pem: bytes) -> str:
+def issue_provisioning_jwt(local_id: str, license_id: str, sk: Ed25519PrivateKey | bytes) -> str:
     """Longer-lived JWT (e.g., 1 day) issued during provisioning."""
     payload = {"local_id": local_id, "license_id": license_id, "type": "provisioning"}
-    return sign_jwt(payload, sk_pem, ttl_seconds=86400)  # 24h
+    return sign_jwt(payload, sk, ttl_seconds=86400)  # 24h
 
 
-def issue_assertion_jwt(local_id: str, license_id: str, sk_pem: bytes) -> str:
+def issue_assertion_jwt(local_id: str, license_id: str, sk: Ed25519PrivateKey | bytes) -> str:
     """Short-lived JWT (e.g., 10 min) for scan authorization."""
     payload = {"local_id": local_id, "license_id": license_id, "type": "assertion"}
-    return sign_jwt(payload, sk_pem, ttl_seconds=600)  # 10 min
+    return sign_jwt(payload, sk, ttl_seconds=600)  # 10 min
+
+
+def issue_lease_jwt(lease: Dict[str, Any], sk: Ed25519PrivateKey | bytes) -> str:
+    """JWT carrying a quota lease; expires together with the lease."""
+    ttl = int((lease["expires_at"] - lease["created_at"]).total_seconds())
+    payload = {
+        "lease_id": str(lease["_id"]),
+        "local_id": lease["local_id"],
+        "license_id": str(lease["license_id"]),
+        "field": lease["field"],
+        "units": lease["units"],
+        "type": "lease",
+    }
+    return sign_jwt(payload, sk, ttl_seconds=ttl)
 
 
 # --- Nonce helper (used by challenge endpoint) ---
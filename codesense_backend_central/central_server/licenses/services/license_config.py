@@ -1,45 +1,59 @@
 # license/services/license_config.py
 from datetime import datetime, timezone
-from .crypto import load_root_keys
-import json
+from django.conf import settings
+from common.lru import LRUCache
+from common.serialization import canonical_json
+from .crypto import get_root_keys
 import base64
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
-from cryptography.hazmat.primitives import serialization
+
+# license_id -> (updated_at, key fingerprint, signed config). An entry is
+# only served while both still match, so license writes (which bump
+# updated_at) and root key rotation (new fingerprint) retire it on their own.
+_signed_configs = LRUCache(maxsize=getattr(settings, "LICENSE_CONFIG_CACHE_SIZE", 10000))
+
+
+def invalidate_license_config(license_id) -> None:
+    """Drop a license's cached config (also retired by its updated_at changing)."""
+    _signed_configs.pop(str(license_id))
 
 
 def generate_license_config(license_doc: dict) -> dict:
     """
     Generate signed license config dict for export to local server.
     Includes central public key and signature.
+
+    Signed configs are cached per (license_id, updated_at, key fingerprint),
+    so `issued_at` is the time this version of the license was first signed
+    with the current root key, not the time of the download. Repeat
+    downloads of an unchanged license return identical bytes.
     """
     if not license_doc:
         raise ValueError("License document not found")
 
-    sk_pem, pk_pem = load_root_keys()
+    root_keys = get_root_keys()
+
+    license_id = str(license_doc["id"])
+    cached = _signed_configs.get(license_id)
+    if cached and cached[0] == license_doc.get("updated_at") and cached[1] == root_keys.fingerprint:
+        return dict(cached[2])
 
     # Fields to include in config
     payload = {
-        "license_id": license_doc["id"],
+        "license_id": license_id,
         "client": license_doc["client"],  # client is client in schema
         "limits": license_doc["limits"],
         "expiry": license_doc["expiry"],
         "status": license_doc["status"],
         "issued_at": datetime.now(timezone.utc).isoformat(),
-        "central_pubkey": pk_pem.decode("utf-8"),
+        "central_pubkey": root_keys.public_pem.decode("utf-8"),
     }
 
     # Sign payload (canonical JSON string for consistency)
-    payload_bytes = json.dumps(payload, sort_keys=True).encode("utf-8")
+    payload_bytes = canonical_json(payload)
 
-    private_key = Ed25519PrivateKey.from_private_bytes(
-        serialization.load_pem_private_key(sk_pem, password=None).private_bytes(
-            encoding=serialization.Encoding.Raw,
-            format=serialization.PrivateFormat.Raw,
-            encryption_algorithm=serialization.NoEncryption(),
-        )
-    )
-    signature = private_key.sign(payload_bytes)
+    signature = root_keys.private_key.sign(payload_bytes)
 
     payload["signature"] = base64.b64encode(signature).decode("utf-8")
 
-    return payload
+    _signed_configs.set(license_id, (license_doc.get("updated_at"), root_keys.fingerprint, payload))
+    return dict(payload)
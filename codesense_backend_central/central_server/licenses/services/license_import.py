@@ -0,0 +1,160 @@
+# licenses/services/license_import.py
+"""
+Bulk license import from CSV or JSONL, read as a stream.
+
+Rows use the LicenseCreateSerializer fields (client_name, client_email,
+scans_limit, users_limit, expiry; a CSV header row names the columns) and
+are validated one by one, then written with unordered `insert_many`
+batches. Only the current batch and the error report are held in memory;
+the report is capped at LICENSE_IMPORT_MAX_ERRORS entries.
+"""
+import csv
+import io
+import json
+import re
+
+from django.conf import settings
+
+from common.response_cache import invalidate_response_cache
+from licenses.models.license_model import LicenseModel
+from licenses.serializers.license_serializers import LicenseCreateSerializer
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: str):
+    """Format from a file name's extension, or None."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return None
+
+
+# Undecodable bytes, as left in the text by errors="surrogateescape"
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+_INVALID_UTF8 = "Invalid UTF-8"
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield (row_number, row, error) from a binary stream; `row` is a dict or
+    None when the line could not be parsed. Row numbers are 1-based data
+    rows (the CSV header is not counted). Malformed CSV rows and rows that
+    are not valid UTF-8 are reported and skipped, the rest still import.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            number = 0
+            while True:
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    row, error = None, f"Invalid CSV: {e}"
+                else:
+                    undecodable = any(isinstance(v, str) and _UNDECODABLE.search(v) for v in row.values())
+                    error = _INVALID_UTF8 if undecodable else None
+                number += 1
+                yield number, None if error else row, error
+
+        number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            number += 1
+            if _UNDECODABLE.search(line):
+                yield number, None, _INVALID_UTF8
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "Expected a JSON object"
+                continue
+            yield number, row, None
+    finally:
+        text.detach()  # leave closing the stream to its owner
+
+
+class ImportReport:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "total_rows": self.total_rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_licenses(stream, fmt, batch_size=None, dry_run=False):
+    """
+    Validate and insert every row of `stream`. With `dry_run` rows are only
+    validated. Returns the report dict (counts plus per-row errors).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    batch_size = batch_size or getattr(settings, "LICENSE_IMPORT_BATCH_SIZE", 1000)
+    report = ImportReport(getattr(settings, "LICENSE_IMPORT_MAX_ERRORS", 1000))
+    batch, batch_rows = [], []
+
+    def flush():
+        if not batch:
+            return
+        if dry_run:
+            report.imported += len(batch)
+        else:
+            inserted_ids, failures = LicenseModel.insert_many(batch)
+            report.imported += len(inserted_ids)
+            for index, message in failures.items():
+                report.fail(batch_rows[index], {"non_field_errors": [message]})
+        batch.clear()
+        batch_rows.clear()
+
+    try:
+        for row_number, row, error in iter_rows(stream, fmt):
+            report.total_rows += 1
+            if error:
+                report.fail(row_number, {"non_field_errors": [error]})
+                continue
+
+            serializer = LicenseCreateSerializer(data=row)
+            if not serializer.is_valid():
+                report.fail(row_number, serializer.errors)
+                continue
+
+            data = serializer.validated_data
+            batch.append(LicenseModel.build_document(
+                client_name=data["client"]["name"],
+                contact_email=data["client"]["contact_email"],
+                limits=data["limits"],
+                expiry=data["expiry"],
+            ))
+            batch_rows.append(row_number)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if report.imported and not dry_run:
+            invalidate_response_cache()
+
+    return report.as_dict()
@@ -0,0 +1,105 @@
+# licenses/services/usage.py
+from licenses.models.lease_model import LeaseModel
+from licenses.models.license_model import LicenseModel
+from licenses.models.usage_idempotency_model import UsageIdempotencyModel
+
+# Re-plan attempts when another writer changes usage between read and write
+MAX_APPLY_ATTEMPTS = 3
+
+
+def _plan(license_doc, events):
+    """
+    Accept events in order while they fit in `limits - usage - leased`.
+    Returns (increments, outcomes) keyed by counter / idempotency key.
+    """
+    remaining = {field: LicenseModel.available(license_doc, field) for field in license_doc["limits"]}
+
+    increments, outcomes = {}, {}
+    for event in events:
+        field = LicenseModel.USAGE_FIELDS[event["type"]]
+        if event["count"] <= remaining.get(field, 0):
+            remaining[field] -= event["count"]
+            increments[field] = increments.get(field, 0) + event["count"]
+            outcomes[event["idempotency_key"]] = {"status": "accepted"}
+        else:
+            outcomes[event["idempotency_key"]] = {
+                "status": "rejected",
+                "error": f"{event['type'].capitalize()} limit reached",
+            }
+    return increments, outcomes
+
+
+def apply_usage_batch(license_id, events, local_id=None):
+    """
+    Apply a batch of usage events against the license limits.
+
+    Replayed idempotency keys are answered from their stored outcome and
+    never applied twice. Fresh events are planned against the current usage
+    and applied with one conditional `$inc` (LicenseModel.increment_usage);
+    if a concurrent writer got there first the batch is re-planned.
+
+    Returns (results, license_doc) with one result per event, in order.
+    """
+    replays = UsageIdempotencyModel.claim(license_id, events)
+    fresh = [event for event in events if event["idempotency_key"] not in replays]
+
+    license_doc, outcomes = None, {}
+    reclaim_checked = False
+    try:
+        for _ in range(MAX_APPLY_ATTEMPTS):
+            license_doc = LicenseModel.find_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS)
+            if not license_doc or license_doc.get("status") != "active":
+                outcomes = {
+                    event["idempotency_key"]: {"status": "rejected", "error": "License not active"}
+                    for event in fresh
+                }
+                break
+
+            increments, outcomes = _plan(license_doc, fresh)
+            rejected = any(outcome["status"] == "rejected" for outcome in outcomes.values())
+            if rejected and not reclaim_checked:
+                reclaim_checked = True
+                # Units parked on expired leases count as taken until reclaimed
+                if LeaseModel.reclaim_for(license_doc):
+                    continue
+            if not increments:
+                break
+            updated = LicenseModel.increment_usage(
+                license_id, increments, local_id=local_id, source="update-usage-batch"
+            )
+            if updated:
+                license_doc = updated
+                break
+        else:
+            # Kept losing the race: release the claims so the local can retry
+            UsageIdempotencyModel.release(license_id, [e["idempotency_key"] for e in fresh])
+            outcomes = {
+                event["idempotency_key"]: {"status": "rejected", "error": "Concurrent update, retry"}
+                for event in fresh
+            }
+            fresh = []
+    except Exception:
+        UsageIdempotencyModel.release(license_id, [e["idempotency_key"] for e in fresh])
+        raise
+
+    UsageIdempotencyModel.record_outcomes(
+        license_id, {key: outcomes[key] for key in (e["idempotency_key"] for e in fresh)}
+    )
+
+    results = []
+    for event in events:
+        key = event["idempotency_key"]
+        stored = replays.get(key)
+        outcome = stored if stored is not None else outcomes[key]
+        result = {
+            "idempotency_key": key,
+            "accepted": outcome.get("status") == "accepted",
+            "duplicate": stored is not None,
+        }
+        if outcome.get("status") == "pending":
+            result["error"] = "Event is still being processed"
+        elif outcome.get("error"):
+            result["error"] = outcome["error"]
+        results.append(result)
+
+    return results, license_doc
@@ -1,3 +1,169 @@
-from django.test import TestCase
+import threading
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
 
-# Create your tests here.
+from bson import ObjectId
+from django.test import SimpleTestCase, override_settings
+
+# Throwaway database for the tests that need MongoDB, dropped afterwards
+TEST_DB_NAME = f"test_codesense_{uuid.uuid4().hex[:12]}"
+
+
+@override_settings(MONGO_DB_NAME=TEST_DB_NAME)
+class MongoTestCase(SimpleTestCase):
+    """
+    Base for tests that talk to MongoDB (MONGO_URI). They run against
+    TEST_DB_NAME, never the configured database, and are skipped when no
+    server is reachable.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from common.db import MongoDBClient
+        try:
+            MongoDBClient()  # collections connect lazily; fail fast here
+        except ConnectionError as e:
+            raise unittest.SkipTest(f"MongoDB not available: {e}")
+
+    @classmethod
+    def tearDownClass(cls):
+        from common.db import MongoDBClient
+        MongoDBClient().drop_database(TEST_DB_NAME)
+        super().tearDownClass()
+
+
+class IncrementUsageConcurrencyTest(MongoTestCase):
+    """
+    Fires parallel usage increments at a single license and checks that the
+    conditional `$inc` neither loses updates nor overshoots the limit.
+    """
+
+    WORKERS = 16
+    PER_WORKER = 25
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from licenses.models.license_model import LicenseModel
+        from licenses.models.dashboard_summary_model import DashboardSummaryModel
+        from licenses.models.usage_event_model import UsageEventModel
+        cls.LicenseModel = LicenseModel
+        cls.DashboardSummaryModel = DashboardSummaryModel
+        cls.UsageEventModel = UsageEventModel
+
+    def _create_license(self, scans_limit):
+        license_doc = self.LicenseModel.create(
+            client_name="Concurrency Test",
+            contact_email="concurrency@codesense.dev",
+            limits={"scans": scans_limit, "users": 1},
+            expiry=datetime.now(timezone.utc) + timedelta(days=1),
+        )
+        license_id = license_doc["id"]
+        self.addCleanup(self._delete_license, license_id)
+        return license_id
+
+    def _delete_license(self, license_id):
+        self.LicenseModel.collection.delete_one({"_id": ObjectId(license_id)})
+        self.DashboardSummaryModel.remove_license(license_id)
+        self.UsageEventModel.remove_license(license_id)
+
+    def _hammer(self, license_id):
+        """Run WORKERS threads x PER_WORKER increments; return the number that succeeded."""
+        barrier = threading.Barrier(self.WORKERS)
+        outcomes = []
+
+        def worker():
+            barrier.wait()
+            for _ in range(self.PER_WORKER):
+                doc = self.LicenseModel.increment_usage(license_id, {"scans": 1})
+                outcomes.append(doc is not None)
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(outcomes), self.WORKERS * self.PER_WORKER)
+        return sum(outcomes)
+
+    def test_parallel_increments_are_not_lost(self):
+        attempts = self.WORKERS * self.PER_WORKER
+        license_id = self._create_license(scans_limit=attempts)
+
+        succeeded = self._hammer(license_id)
+
+        final = self.LicenseModel.find_by_id(license_id)["usage"]["scans"]
+        self.assertEqual(succeeded, attempts)
+        self.assertEqual(final, attempts)
+
+    def test_parallel_increments_never_overshoot_limit(self):
+        limit = (self.WORKERS * self.PER_WORKER) // 3
+        license_id = self._create_license(scans_limit=limit)
+
+        succeeded = self._hammer(license_id)
+
+        final = self.LicenseModel.find_by_id(license_id)["usage"]["scans"]
+        self.assertEqual(succeeded, limit)
+        self.assertEqual(final, limit)
+
+
+class LeaseExpiryTest(MongoTestCase):
+    """An expired lease is charged in full, even when the local releases it late."""
+
+    def setUp(self):
+        from licenses.models.lease_model import LeaseModel
+        from licenses.models.license_model import LicenseModel
+        self.LeaseModel = LeaseModel
+        self.LicenseModel = LicenseModel
+        self.license_id = str(LicenseModel.create(
+            client_name="Lease Test",
+            contact_email="lease@codesense.dev",
+            limits={"scans": 100, "users": 1},
+            expiry=datetime.now(timezone.utc) + timedelta(days=1),
+        )["id"])
+
+    def _expired_lease(self):
+        lease = self.LeaseModel.grant(self.license_id, "LOCAL-TEST", "scans")
+        self.assertIsNotNone(lease)
+        self.LeaseModel.collection.update_one(
+            {"_id": lease["_id"]},
+            {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+        )
+        return lease
+
+    def test_late_release_is_refused_and_lease_charged_in_full(self):
+        lease = self._expired_lease()
+
+        self.assertIsNone(self.LeaseModel.release(lease["_id"], "LOCAL-TEST", 1))
+        self.assertEqual(self.LeaseModel.reclaim_expired(self.license_id), 1)
+
+        license_doc = self.LicenseModel.find_by_id(self.license_id, fields=self.LicenseModel.QUOTA_FIELDS)
+        self.assertEqual(license_doc["usage"]["scans"], lease["units"])
+        self.assertEqual(license_doc["leased"]["scans"], 0)
+
+    def test_release_before_expiry_charges_reported_use(self):
+        lease = self.LeaseModel.grant(self.license_id, "LOCAL-TEST", "scans")
+
+        self.assertIsNotNone(self.LeaseModel.release(lease["_id"], "LOCAL-TEST", 1))
+
+        license_doc = self.LicenseModel.find_by_id(self.license_id, fields=self.LicenseModel.QUOTA_FIELDS)
+        self.assertEqual(license_doc["usage"]["scans"], 1)
+        self.assertEqual(license_doc["leased"]["scans"], 0)
+
+
+class ChallengeTokenTest(SimpleTestCase):
+    """Stateless challenge tokens (CHALLENGE_MODE = "stateless")."""
+
+    def test_round_trip(self):
+        from licenses.services.challenges import issue_challenge_token, verify_challenge_token
+        token = issue_challenge_token("LOCAL-A", "license-1", 60)
+        self.assertIsNotNone(verify_challenge_token(token, "LOCAL-A", "license-1"))
+        self.assertIsNone(verify_challenge_token(token, "LOCAL-B", "license-1"))
+
+    def test_non_ascii_token_is_rejected(self):
+        from licenses.services.challenges import verify_challenge_token
+        for token in ("é.é", "abc.ü", "ß.abc"):
+            self.assertIsNone(verify_challenge_token(token, "LOCAL-A", "license-1"))
@@ -1,10 +1,13 @@
 from django.urls import path, include
-from ..views.license_views import LicenseCreateView, LicenseListView, LicenseDetailView, LicenseStatusUpdateView, LicenseConfigExportView
+from ..views.license_views import LicenseCreateView, LicenseImportView, LicenseListView, LicenseDetailView, LicenseStatusUpdateView, LicenseConfigExportView, LicenseConfigBulkExportView, LicenseUsageSeriesView
 
 urlpatterns = [
     path("create/", LicenseCreateView.as_view(), name="create_license"),
     path("", LicenseListView.as_view(), name="license_list"),
+    path("import/", LicenseImportView.as_view(), name="import_licenses"),
+    path("config/export/", LicenseConfigBulkExportView.as_view(), name="license_config_bulk_export"),
     path("<str:license_id>/", LicenseDetailView.as_view(), name="license_details_by_if"),
+    path("<str:license_id>/usage/", LicenseUsageSeriesView.as_view(), name="license_usage_series"),
     path("update_status/<str:license_id>", LicenseStatusUpdateView.as_view(), name="update_license_status"),
     path("config/<str:license_id>", LicenseConfigExportView.as_view(), name="license_config")
 ]
@@ -1,10 +1,26 @@
-from django.urls import path, include
-from ..views.local_views import LocalProvisionView, ChallengeRequestView, ChallengeAssertionView, UpdateUsageView, LocalDetailsView
+from django.conf import settings
+from django.urls import path
+from ..views import local_async_views, local_views
+
+if getattr(settings, "ASYNC_LOCAL_HANDSHAKE", False):
+    # Native async handshake, only worth it when served under ASGI
+    LocalProvisionView = local_async_views.AsyncLocalProvisionView
+    ChallengeRequestView = local_async_views.AsyncChallengeRequestView
+    ChallengeAssertionView = local_async_views.AsyncChallengeAssertionView
+    UpdateUsageView = local_async_views.AsyncUpdateUsageView
+else:
+    LocalProvisionView = local_views.LocalProvisionView
+    ChallengeRequestView = local_views.ChallengeRequestView
+    ChallengeAssertionView = local_views.ChallengeAssertionView
+    UpdateUsageView = local_views.UpdateUsageView
 
 urlpatterns = [
     path("provision/", LocalProvisionView.as_view(), name="local_provision"),
     path("challenge/", ChallengeRequestView.as_view(), name="request_challenge"),
     path("assertion/", ChallengeAssertionView.as_view(), name="assertion_request"),
     path("update-usage/", UpdateUsageView.as_view(), name="assertion_request"),
-    path("license/<str:license_id>/", LocalDetailsView.as_view(), name="local_by_license_id"),
+    path("update-usage/batch/", local_views.UpdateUsageBatchView.as_view(), name="update_usage_batch"),
+    path("lease/", local_views.LeaseGrantView.as_view(), name="lease_grant"),
+    path("lease/release/", local_views.LeaseReleaseView.as_view(), name="lease_release"),
+    path("license/<str:license_id>/", local_views.LocalDetailsView.as_view(), name="local_by_license_id"),
 ]
@@ -1,56 +1,35 @@
 from datetime import datetime, timezone
 from django.http import JsonResponse
-from common.db import MongoDBClient
 from rest_framework.views import APIView
 
-db = MongoDBClient.get_database()
+from common.response_cache import cache_response
+from licenses.models.dashboard_summary_model import DashboardSummaryModel
+
 
 class DashboardView(APIView):
 
+    @cache_response("dashboard", DashboardSummaryModel.latest_update)
     def get(self, request):
-        licenses = list(db.licenses.find({}))  # fetch all licenses
+        # Pre-computed rows; see DashboardSummaryModel for how they are maintained
+        rows, totals = DashboardSummaryModel.snapshot()
+        users_count = totals.get("users_total", 0)
 
         response = {"license": []}  # top-level key
+        now = datetime.now(timezone.utc)
 
-        for license_doc in licenses:
-            # Linked locals count
-            locals_count = db.locals.count_documents({"license_id": license_doc["_id"]})
-
-            # Users count (global or per license depending on your schema)
-            users_count = db.users.count_documents({"deleted": False})
-
-            # Scan usage %
-            scan_limit = license_doc["limits"]["scans"]
-            scan_usage = license_doc["usage"]["scans"]
-            scan_percentage = round((scan_usage / scan_limit) * 100, 2) if scan_limit else 0
-
-            # User usage %
-            user_limit = license_doc["limits"]["users"]
-            user_usage = license_doc["usage"]["users"]
-            user_percentage = round((user_usage / user_limit) * 100, 2) if user_limit else 0
-
+        for row in rows:
             # Expiry check
-            expiry_date = license_doc["expiry"].replace(tzinfo=timezone.utc)
-            days_left = (expiry_date - datetime.now(timezone.utc)).days
+            expiry_date = row["expiry"].replace(tzinfo=timezone.utc)
+            days_left = (expiry_date - now).days
 
             response["license"].append({
-                "client": license_doc["client"],
-                "status": license_doc["status"],
+                "client": row["client"],
+                "status": row["status"],
                 "expiry_date": expiry_date.strftime("%Y-%m-%d"),
                 "days_left": days_left,
-                "scans": {
-                    "used": scan_usage,
-                    "limit": scan_limit,
-                    "percentage": scan_percentage
-                },
-                "users": {
-                    "used": user_usage,
-                    "limit": user_limit,
-                    "percentage": user_percentage
-                },
-                "locals": {
-                    "total": locals_count
-                },
+                "scans": DashboardSummaryModel.usage_block(row["scans"]["used"], row["scans"]["limit"]),
+                "users": DashboardSummaryModel.usage_block(row["users"]["used"], row["users"]["limit"]),
+                "locals": row["locals"],
                 "users_summary": {   # renamed to avoid duplicate "users"
                     "total": users_count
                 }
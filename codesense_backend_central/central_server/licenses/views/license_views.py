@@ -2,12 +2,17 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import HttpResponse
-import json
+from django.http import HttpResponse, StreamingHttpResponse
 
+from common.db.pagination import parse_page_params
+from common.serialization import dumps
+from common.response_cache import cache_response
 from ..models.license_model import LicenseModel
-from ..serializers.license_serializers import LicenseCreateSerializer, LicenseUpdateSerializer
+from ..models.usage_event_model import UsageEventModel
+from ..serializers.license_serializers import LicenseCreateSerializer, LicenseUpdateSerializer, UsageSeriesQuerySerializer
+from ..services.config_export import export_query, stream_config_zip
 from ..services.license_config import generate_license_config
+from ..services.license_import import FORMATS, detect_format, import_licenses
 
 class LicenseCreateView(APIView):
     """
@@ -34,19 +39,43 @@ class LicenseCreateView(APIView):
         )
 
 
+class LicenseImportView(APIView):
+    """
+    POST /licenses/import/  (multipart: file=<licenses.csv|.jsonl>, format=csv|jsonl, dry_run=true)
+    Bulk-create licenses from a CSV or JSONL upload, streamed in batches.
+    Returns counts and a per-row error report.
+    """
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "Missing file"}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get("format") or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"Unknown format, use one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = str(request.data.get("dry_run", "")).lower() == "true"
+        report = import_licenses(upload, fmt, dry_run=dry_run)
+        return Response(report, status=status.HTTP_200_OK)
+
+
 class LicenseListView(APIView):
     """
     GET /licenses/?page=1&limit=10
-    List all licenses with pagination.
+    GET /licenses/?cursor=<next_cursor>&limit=50&sort=created_at&total=none
+    List all licenses with page or keyset (cursor) pagination.
     """
+    @cache_response("licenses", LicenseModel.latest_update)
     def get(self, request):
         try:
-            page = int(request.query_params.get("page", 1))
-            limit = int(request.query_params.get("limit", 10))
+            params = parse_page_params(request.query_params, LicenseModel.SORT_FIELDS)
         except ValueError:
             return Response({"error": "Invalid pagination parameters"}, status=status.HTTP_400_BAD_REQUEST)
 
-        result = LicenseModel.list_all(page=page, limit=limit)
+        result = LicenseModel.list_all(**params)
         return Response(result, status=status.HTTP_200_OK)
 
 
@@ -110,8 +139,58 @@ class LicenseConfigExportView(APIView):
 
         # Return as downloadable file
         response = HttpResponse(
-            json.dumps(config, indent=2),
+            dumps(config, indent=True),
             content_type="application/octet-stream"
         )
         response["Content-Disposition"] = f'attachment; filename="license_{license_id}.json"'
         return response
+
+
+class LicenseConfigBulkExportView(APIView):
+    """
+    GET /licenses/config/export/?status=active&client=acme&ids=<id>,<id>
+    Stream a ZIP of signed license_<id>.json configs for every matching license.
+    """
+
+    def get(self, request):
+        ids = request.query_params.get("ids")
+        try:
+            query = export_query(
+                status=request.query_params.get("status"),
+                client=request.query_params.get("client"),
+                ids=[license_id for license_id in ids.split(",") if license_id] if ids else None,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream_config_zip(query), content_type="application/zip")
+        response["Content-Disposition"] = 'attachment; filename="license_configs.zip"'
+        return response
+
+
+class LicenseUsageSeriesView(APIView):
+    """
+    GET /licenses/{license_id}/usage/?granularity=day&start=...&end=...
+    Usage time series of a license from the hourly/daily rollups.
+    """
+
+    def get(self, request, license_id):
+        serializer = UsageSeriesQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not LicenseModel.find_by_id(license_id):
+            return Response({"error": "License not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        query = serializer.validated_data
+        series = UsageEventModel.series(license_id, query["granularity"], query["start"], query["end"])
+        return Response(
+            {
+                "license_id": license_id,
+                "granularity": query["granularity"],
+                "start": query["start"],
+                "end": query["end"],
+                "series": series,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,240 @@
+# licenses/views/local_async_views.py
+"""
+Async forms of the local handshake views, for serving under ASGI
+(`central_server.asgi`). Mongo round trips go through pymongo's async
+client, so a worker keeps accepting requests while queries are in flight
+instead of parking one thread per request. Selected by
+ASYNC_LOCAL_HANDSHAKE in licenses/urls/local_urls.py; request and
+response bodies match the DRF views in local_views.py.
+"""
+import base64
+import json
+import uuid
+
+from asgiref.sync import sync_to_async
+from cryptography.exceptions import InvalidSignature
+from django.http import JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+
+from licenses.models.lease_model import LeaseModel
+from licenses.models.license_model import LicenseModel
+from licenses.models.local_model import LocalModel
+from licenses.serializers.local_serializers import LocalProvisionSerializer
+from licenses.services.challenges import aconsume_challenge, aissue_challenge, challenge_ttl
+from licenses.services.crypto import (
+    get_root_keys,
+    issue_provisioning_jwt,
+    issue_assertion_jwt,
+    load_local_public_key,
+    verify_jwt,
+)
+
+
+class AsyncLocalView(View):
+    """Base for the async handshake views: JSON in, JSON out, no CSRF (like APIView)."""
+    http_method_names = ["post"]
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def parse(request):
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            raise ValueError("Malformed JSON body")
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        return data
+
+
+class AsyncLocalProvisionView(AsyncLocalView):
+    """Async LocalProvisionView; provisioning itself stays on the sync model path."""
+
+    async def post(self, request):
+        try:
+            serializer = LocalProvisionSerializer(data=self.parse(request))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        license_id = data["license_id"]
+
+        license_doc = await LicenseModel.afind_by_id(license_id, fields={"status": 1})
+        if not license_doc or license_doc["status"] != "active":
+            return JsonResponse({"error": "Invalid or inactive license"}, status=status.HTTP_404_NOT_FOUND)
+
+        local_id = f"LOCAL-{uuid.uuid4().hex[:6].upper()}"
+        # Rare call that also maintains the dashboard summary: reuse the sync path
+        await sync_to_async(LocalModel.create, thread_sensitive=False)(
+            license_id=license_doc["_id"],
+            local_id=local_id,
+            public_key=data["local_pubkey"],
+            machine_uuid=data.get("machine_uuid"),
+        )
+
+        root_keys = get_root_keys()
+        provisioning_jwt = issue_provisioning_jwt(local_id, license_id, root_keys.private_key)
+
+        return JsonResponse(
+            {
+                "local_id": local_id,
+                "license_id": license_id,
+                "central_pubkey": root_keys.public_pem.decode(),
+                "provisioning_jwt": provisioning_jwt,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AsyncChallengeRequestView(AsyncLocalView):
+    """Async ChallengeRequestView."""
+
+    async def post(self, request):
+        try:
+            data = self.parse(request)
+            license_id = data.get("license_id")
+            local_id = data.get("local_id")
+            provisioning_jwt = data.get("provisioning_jwt")
+
+            if not (license_id and local_id and provisioning_jwt):
+                return JsonResponse({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
+
+            payload = verify_jwt(provisioning_jwt, get_root_keys().public_key)
+            if payload.get("local_id") != local_id or payload.get("license_id") != license_id:
+                return JsonResponse({"error": "Provisioning token mismatch"}, status=status.HTTP_403_FORBIDDEN)
+
+            nonce = await aissue_challenge(local_id, license_id)
+
+            return JsonResponse({"nonce": nonce, "expires_in": challenge_ttl()}, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncChallengeAssertionView(AsyncLocalView):
+    """Async ChallengeAssertionView; checks limits but does not increment usage."""
+
+    async def post(self, request):
+        try:
+            data = self.parse(request)
+            license_id = data.get("license_id")
+            local_id = data.get("local_id")
+            provisioning_jwt = data.get("provisioning_jwt")
+            nonce = data.get("nonce")
+            signed_nonce_b64 = data.get("signed_nonce")
+            usage_type = data.get("usage_type")  # "scan" or "user"
+
+            if not all([license_id, local_id, provisioning_jwt, nonce, signed_nonce_b64]):
+                return JsonResponse({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
+
+            root_keys = get_root_keys()
+
+            payload = verify_jwt(provisioning_jwt, root_keys.public_key)
+            if payload.get("local_id") != local_id or payload.get("license_id") != license_id:
+                return JsonResponse({"error": "Provisioning token mismatch"}, status=status.HTTP_403_FORBIDDEN)
+
+            local_doc = await LocalModel.aget_by_local_id(local_id, fields=LocalModel.HANDSHAKE_FIELDS)
+            if not local_doc or str(local_doc.get("license_id")) != license_id:
+                return JsonResponse({"error": "Local not found or mismatched license"}, status=status.HTTP_404_NOT_FOUND)
+
+            if local_doc.get("status", "active") != "active":
+                return JsonResponse({"error": "Local is not active"}, status=status.HTTP_403_FORBIDDEN)
+
+            if not await aconsume_challenge(nonce, local_id, license_id):
+                return JsonResponse({"error": "Invalid nonce"}, status=status.HTTP_403_FORBIDDEN)
+
+            public_key = load_local_public_key(local_id, local_doc.get("public_key"))
+            public_key.verify(base64.urlsafe_b64decode(signed_nonce_b64 + "=="), nonce.encode())
+
+            license_doc = await LicenseModel.afind_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS)
+            if not license_doc or license_doc.get("status") != "active":
+                return JsonResponse({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
+
+            # Units parked on expired leases count as taken until reclaimed
+            field = LicenseModel.USAGE_FIELDS.get(usage_type)
+            if (
+                field and LicenseModel.available(license_doc, field) <= 0
+                and await sync_to_async(LeaseModel.reclaim_for, thread_sensitive=False)(license_doc)
+            ):
+                license_doc = await LicenseModel.afind_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS) or license_doc
+
+            usage = license_doc.get("usage", {"scans": 0, "users": 0})
+
+            if usage_type == "scan" and LicenseModel.available(license_doc, "scans") <= 0:
+                return JsonResponse({"error": "Scan limit reached"}, status=status.HTTP_403_FORBIDDEN)
+            if usage_type == "user" and LicenseModel.available(license_doc, "users") <= 0:
+                return JsonResponse({"error": "User limit reached"}, status=status.HTTP_403_FORBIDDEN)
+
+            assertion_jwt = issue_assertion_jwt(local_id, license_id, root_keys.private_key)
+
+            return JsonResponse(
+                {
+                    "assertion_jwt": assertion_jwt,
+                    "allowed": True,
+                    "usage_preview": usage,
+                    "remaining": {
+                        "scans": LicenseModel.available(license_doc, "scans"),
+                        "users": LicenseModel.available(license_doc, "users"),
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except InvalidSignature:
+            return JsonResponse({"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncUpdateUsageView(AsyncLocalView):
+    """Async UpdateUsageView."""
+
+    async def post(self, request):
+        try:
+            data = self.parse(request)
+            license_id = data.get("license_id")
+            usage_type = data.get("usage_type")  # "scan" or "user"
+
+            if not all([license_id, usage_type]):
+                return JsonResponse({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
+
+            field = LicenseModel.USAGE_FIELDS.get(usage_type)
+            if not field:
+                return JsonResponse({"error": "Invalid usage_type"}, status=status.HTTP_400_BAD_REQUEST)
+
+            license_doc = await LicenseModel.aincrement_usage(
+                license_id, {field: 1}, local_id=data.get("local_id"), source="update-usage"
+            )
+            if not license_doc:
+                current = await LicenseModel.afind_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS)
+                if not current or current.get("status") != "active":
+                    return JsonResponse({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
+                # Units parked on expired leases count as taken until reclaimed
+                if await sync_to_async(LeaseModel.reclaim_for, thread_sensitive=False)(current):
+                    license_doc = await LicenseModel.aincrement_usage(
+                        license_id, {field: 1}, local_id=data.get("local_id"), source="update-usage"
+                    )
+            if not license_doc:
+                return JsonResponse({"error": f"{usage_type.capitalize()} limit reached"}, status=status.HTTP_403_FORBIDDEN)
+
+            return JsonResponse(
+                {
+                    "updated": True,
+                    "usage": license_doc["usage"],
+                    "remaining": {
+                        "scans": LicenseModel.available(license_doc, "scans"),
+                        "users": LicenseModel.available(license_doc, "users"),
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -3,22 +3,23 @@ from rest_framework.response import Response
 from rest_framework import status
 import uuid
 import base64
-from bson import ObjectId
 from datetime import datetime, timezone
 
+from licenses.models.lease_model import LeaseModel
 from licenses.models.license_model import LicenseModel
 from licenses.models.local_model import LocalModel
-from licenses.serializers.local_serializers import LocalProvisionSerializer
+from licenses.serializers.local_serializers import LocalProvisionSerializer, UsageBatchSerializer
+from licenses.services.challenges import challenge_ttl, consume_challenge, issue_challenge
+from licenses.services.usage import apply_usage_batch
 from licenses.services.crypto import (
-    load_root_keys,
+    get_root_keys,
     issue_provisioning_jwt,
     issue_assertion_jwt,
-    random_nonce,
+    issue_lease_jwt,
+    load_local_public_key,
     verify_jwt,
 )
 
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
-from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 
 
@@ -38,7 +39,7 @@ class LocalProvisionView(APIView):
         license_id = data["license_id"]
 
         # Validate license exists and active
-        license_doc = LicenseModel.find_by_id(license_id)
+        license_doc = LicenseModel.find_by_id(license_id, fields={"status": 1})
         if not license_doc or license_doc["status"] != "active":
             return Response({"error": "Invalid or inactive license"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -51,18 +52,18 @@ class LocalProvisionView(APIView):
             machine_uuid=data.get("machine_uuid"),
         )
 
-        # Load Central root keys
-        sk_pem, pk_pem = load_root_keys()
+        # Central root keys (parsed once, cached in memory)
+        root_keys = get_root_keys()
 
         # Issue provisioning JWT (valid ~24h)
-        provisioning_jwt = issue_provisioning_jwt(local_id, license_id, sk_pem)
+        provisioning_jwt = issue_provisioning_jwt(local_id, license_id, root_keys.private_key)
 
         # Response package
         return Response(
             {
                 "local_id": local_id,
                 "license_id": license_id,
-                "central_pubkey": pk_pem.decode(),
+                "central_pubkey": root_keys.public_pem.decode(),
                 "provisioning_jwt": provisioning_jwt,
             },
             status=status.HTTP_201_CREATED,
@@ -83,22 +84,15 @@ class ChallengeRequestView(APIView):
             if not (license_id and local_id and provisioning_jwt):
                 return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Load central root keys
-            _, central_pk = load_root_keys()
-
             # Verify provisioning JWT
-            payload = verify_jwt(provisioning_jwt, central_pk)
+            payload = verify_jwt(provisioning_jwt, get_root_keys().public_key)
             if payload.get("local_id") != local_id or payload.get("license_id") != license_id:
                 return Response({"error": "Provisioning token mismatch"}, status=status.HTTP_403_FORBIDDEN)
 
-            # Generate and store nonce
-            nonce = random_nonce()
-            LocalModel.collection.update_one(
-                {"local_id": local_id, "license_id": ObjectId(license_id)},
-                {"$set": {"nonce": nonce}},
-            )
+            # Generate nonce (stored, or a signed token in stateless mode)
+            nonce = issue_challenge(local_id, license_id)
 
-            return Response({"nonce": nonce}, status=status.HTTP_200_OK)
+            return Response({"nonce": nonce, "expires_in": challenge_ttl()}, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -124,51 +118,50 @@ class ChallengeAssertionView(APIView):
             if not all([license_id, local_id, provisioning_jwt, nonce, signed_nonce_b64]):
                 return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Load central root keys
-            central_sk, central_pk = load_root_keys()
+            # Central root keys (parsed once, cached in memory)
+            root_keys = get_root_keys()
 
             # Verify provisioning JWT
-            payload = verify_jwt(provisioning_jwt, central_pk)
+            payload = verify_jwt(provisioning_jwt, root_keys.public_key)
             if payload.get("local_id") != local_id or payload.get("license_id") != license_id:
                 return Response({"error": "Provisioning token mismatch"}, status=status.HTTP_403_FORBIDDEN)
 
             # Fetch local record
-            local_doc = LocalModel.get_by_local_id(local_id)
+            local_doc = LocalModel.get_by_local_id(local_id, fields=LocalModel.HANDSHAKE_FIELDS)
             if not local_doc or str(local_doc.get("license_id")) != license_id:
                 return Response({"error": "Local not found or mismatched license"}, status=status.HTTP_404_NOT_FOUND)
 
-            # Verify nonce
-            if local_doc.get("nonce") != nonce:
+            if local_doc.get("status", "active") != "active":
+                return Response({"error": "Local is not active"}, status=status.HTTP_403_FORBIDDEN)
+
+            # Verify and consume nonce in one atomic step (one-shot even if the signature fails)
+            if not consume_challenge(nonce, local_id, license_id):
                 return Response({"error": "Invalid nonce"}, status=status.HTTP_403_FORBIDDEN)
 
-            # Verify signed nonce
-            public_key_pem = local_doc.get("public_key")
-            public_key = Ed25519PublicKey.from_public_bytes(
-                serialization.load_pem_public_key(public_key_pem.encode()).public_bytes(
-                    encoding=serialization.Encoding.Raw,
-                    format=serialization.PublicFormat.Raw,
-                )
-            )
+            # Verify signed nonce (parsed key comes from the in-process LRU)
+            public_key = load_local_public_key(local_id, local_doc.get("public_key"))
             public_key.verify(base64.urlsafe_b64decode(signed_nonce_b64 + "=="), nonce.encode())
 
             # ---- Check limits but DO NOT increment ----
-            license_doc = LicenseModel.find_by_id(license_id)
+            license_doc = LicenseModel.find_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS)
             if not license_doc or license_doc.get("status") != "active":
                 return Response({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
 
-            limits = license_doc["limits"]
+            # Units parked on expired leases count as taken until reclaimed
+            field = LicenseModel.USAGE_FIELDS.get(usage_type)
+            if field and LicenseModel.available(license_doc, field) <= 0 and LeaseModel.reclaim_for(license_doc):
+                license_doc = LicenseModel.find_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS) or license_doc
+
             usage = license_doc.get("usage", {"scans": 0, "users": 0})
 
-            if usage_type == "scan" and usage["scans"] >= limits["scans"]:
+            # Units held by quota leases are not available to single-shot calls
+            if usage_type == "scan" and LicenseModel.available(license_doc, "scans") <= 0:
                 return Response({"error": "Scan limit reached"}, status=status.HTTP_403_FORBIDDEN)
-            if usage_type == "user" and usage["users"] >= limits["users"]:
+            if usage_type == "user" and LicenseModel.available(license_doc, "users") <= 0:
                 return Response({"error": "User limit reached"}, status=status.HTTP_403_FORBIDDEN)
 
             # Issue assertion_jwt (valid short time)
-            assertion_jwt = issue_assertion_jwt(local_id, license_id, central_sk)
-
-            # Clear nonce
-            LocalModel.collection.update_one({"local_id": local_id}, {"$unset": {"nonce": ""}})
+            assertion_jwt = issue_assertion_jwt(local_id, license_id, root_keys.private_key)
 
             return Response(
                 {
@@ -176,8 +169,8 @@ class ChallengeAssertionView(APIView):
                     "allowed": True,
                     "usage_preview": usage,
                     "remaining": {
-                        "scans": limits["scans"] - usage["scans"],
-                        "users": limits["users"] - usage["users"],
+                        "scans": LicenseModel.available(license_doc, "scans"),
+                        "users": LicenseModel.available(license_doc, "users"),
                     },
                 },
                 status=status.HTTP_200_OK,
@@ -203,33 +196,36 @@ class UpdateUsageView(APIView):
             if not all([license_id, usage_type]):
                 return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Get license
-            license_doc = LicenseModel.find_by_id(license_id)
-            if not license_doc or license_doc.get("status") != "active":
-                return Response({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
-
-            limits = license_doc["limits"]
-            usage = license_doc.get("usage", {"scans": 0, "users": 0})
-
-            # Increment AFTER success
-            if usage_type == "scan":
-                if usage["scans"] >= limits["scans"]:
-                    return Response({"error": "Scan limit reached"}, status=status.HTTP_403_FORBIDDEN)
-                usage["scans"] += 1
-            elif usage_type == "user":
-                if usage["users"] >= limits["users"]:
-                    return Response({"error": "User limit reached"}, status=status.HTTP_403_FORBIDDEN)
-                usage["users"] += 1
+            field = LicenseModel.USAGE_FIELDS.get(usage_type)
+            if not field:
+                return Response({"error": "Invalid usage_type"}, status=status.HTTP_400_BAD_REQUEST)
 
-            LicenseModel.collection.update_one({"_id": license_doc["_id"]}, {"$set": {"usage": usage}})
+            # Increment AFTER success, limit check and write in one round trip
+            license_doc = LicenseModel.increment_usage(
+                license_id, {field: 1}, local_id=request.data.get("local_id"), source="update-usage"
+            )
+            if not license_doc:
+                # Conditional update matched nothing: work out why
+                current = LicenseModel.find_by_id(license_id, fields=LicenseModel.QUOTA_FIELDS)
+                if not current or current.get("status") != "active":
+                    return Response({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
+                # Units parked on expired leases count as taken until reclaimed
+                if LeaseModel.reclaim_for(current):
+                    license_doc = LicenseModel.increment_usage(
+                        license_id, {field: 1}, local_id=request.data.get("local_id"), source="update-usage"
+                    )
+            if not license_doc:
+                return Response({"error": f"{usage_type.capitalize()} limit reached"}, status=status.HTTP_403_FORBIDDEN)
+
+            usage = license_doc["usage"]
 
             return Response(
                 {
                     "updated": True,
                     "usage": usage,
                     "remaining": {
-                        "scans": limits["scans"] - usage["scans"],
-                        "users": limits["users"] - usage["users"],
+                        "scans": LicenseModel.available(license_doc, "scans"),
+                        "users": LicenseModel.available(license_doc, "users"),
                     },
                 },
                 status=status.HTTP_200_OK,
@@ -239,6 +235,144 @@ class UpdateUsageView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class UpdateUsageBatchView(APIView):
+    """
+    Batched form of UpdateUsageView for busy locals.
+    Body: {"license_id": ..., "events": [{"idempotency_key", "type", "count"}]}
+    Replayed keys are not applied twice; each event gets its own result.
+    """
+
+    def post(self, request):
+        serializer = UsageBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        try:
+            results, license_doc = apply_usage_batch(
+                data["license_id"], data["events"], local_id=data.get("local_id")
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = {"results": results}
+        if license_doc:
+            usage = license_doc["usage"]
+            response["usage"] = usage
+            response["remaining"] = {
+                "scans": LicenseModel.available(license_doc, "scans"),
+                "users": LicenseModel.available(license_doc, "users"),
+            }
+        return Response(response, status=status.HTTP_200_OK)
+
+
+def _verify_local(license_id, local_id, provisioning_jwt):
+    """
+    Check the provisioning JWT and that the local is active under the
+    license. Returns an error Response, or None when the caller may proceed.
+    """
+    payload = verify_jwt(provisioning_jwt, get_root_keys().public_key)
+    if payload.get("local_id") != local_id or payload.get("license_id") != license_id:
+        return Response({"error": "Provisioning token mismatch"}, status=status.HTTP_403_FORBIDDEN)
+
+    local_doc = LocalModel.get_by_local_id(local_id, fields=LocalModel.HANDSHAKE_FIELDS)
+    if not local_doc or str(local_doc.get("license_id")) != license_id:
+        return Response({"error": "Local not found or mismatched license"}, status=status.HTTP_404_NOT_FOUND)
+    if local_doc.get("status", "active") != "active":
+        return Response({"error": "Local is not active"}, status=status.HTTP_403_FORBIDDEN)
+    return None
+
+
+class LeaseGrantView(APIView):
+    """
+    Grant a local a block of scans or users it may spend without calling
+    central, valid for LEASE_DURATION_SECONDS. The block is sized from the
+    local's observed consumption and reserved atomically on the license.
+    Body: {"license_id", "local_id", "provisioning_jwt", "usage_type"}
+    """
+
+    def post(self, request):
+        try:
+            license_id = request.data.get("license_id")
+            local_id = request.data.get("local_id")
+            provisioning_jwt = request.data.get("provisioning_jwt")
+            usage_type = request.data.get("usage_type")
+
+            if not all([license_id, local_id, provisioning_jwt, usage_type]):
+                return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
+
+            field = LicenseModel.USAGE_FIELDS.get(usage_type)
+            if not field:
+                return Response({"error": "Invalid usage_type"}, status=status.HTTP_400_BAD_REQUEST)
+
+            error = _verify_local(license_id, local_id, provisioning_jwt)
+            if error:
+                return error
+
+            lease = LeaseModel.grant(license_id, local_id, field)
+            if not lease:
+                current = LicenseModel.find_by_id(license_id, fields={"status": 1})
+                if not current or current.get("status") != "active":
+                    return Response({"error": "License not active"}, status=status.HTTP_403_FORBIDDEN)
+                return Response({"error": f"{usage_type.capitalize()} limit reached"}, status=status.HTTP_403_FORBIDDEN)
+
+            return Response(
+                {
+                    "lease": LeaseModel.serialize(lease),
+                    "lease_jwt": issue_lease_jwt(lease, get_root_keys().private_key),
+                },
+                status=status.HTTP_201_CREATED,
+            )
+
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LeaseReleaseView(APIView):
+    """
+    Report consumption on a lease. With `final` (the default) the lease is
+    closed: `used` units become usage and the rest return to the license.
+    With `final: false` `used` is only recorded as progress; a lease that
+    expires without being released is charged in full.
+    Body: {"license_id", "local_id", "provisioning_jwt", "lease_id", "used", "final"}
+    """
+
+    def post(self, request):
+        try:
+            license_id = request.data.get("license_id")
+            local_id = request.data.get("local_id")
+            provisioning_jwt = request.data.get("provisioning_jwt")
+            lease_id = request.data.get("lease_id")
+            used = request.data.get("used")
+            final = request.data.get("final", True)
+
+            if not all([license_id, local_id, provisioning_jwt, lease_id]) or used is None:
+                return Response({"error": "Missing required fields"}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(used, int) or isinstance(used, bool) or used < 0:
+                return Response({"error": "used must be a non-negative integer"}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(final, bool):
+                # Form-encoded bodies carry strings; anything but true/false is refused
+                final = {"true": True, "false": False}.get(str(final).lower())
+                if final is None:
+                    return Response({"error": "final must be true or false"}, status=status.HTTP_400_BAD_REQUEST)
+
+            error = _verify_local(license_id, local_id, provisioning_jwt)
+            if error:
+                return error
+
+            if final:
+                lease = LeaseModel.release(lease_id, local_id, used)
+            else:
+                lease = LeaseModel.report(lease_id, local_id, used)
+            if not lease:
+                return Response({"error": "Lease not found or no longer active"}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({"lease": LeaseModel.serialize(lease)}, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 class LocalDetailsView(APIView):
     def get(self, request, license_id):
         # Fetch license + local